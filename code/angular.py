@@ -0,0 +1,195 @@
+"""
+Angular measure estimation: histograms of theta above radial quantiles.
+
+For each point, r = |X| and theta = arccos(X_1 / |X|). The theta histograms
+of the points whose radius exceeds the p-quantile of r (e.g. p = 0.8, 0.9)
+estimate the angular (spectral) measure of the tail, as in the theta_hist_p80,
+theta_hist_p90 and theta_latent_dim=* figures of Chapter 3.
+
+Two estimators, both computing r and theta in one pass over chunks:
+
+- `theta_histograms`: in-memory samples; all radial thresholds are found by
+  a single np.partition with several kth (no sort).
+- `AngularSketch`: streaming samples that do not fit in memory. Each chunk
+  updates a joint count table over (log-radius bin, theta bin); log-radius
+  bins have a fixed relative width, so any radial quantile is known to that
+  relative accuracy, and the theta histograms for every threshold are read
+  from the table at the end. Memory is independent of n.
+
+Example:
+    sketch = AngularSketch()
+    for chunk in model.sample(10**8, margins):
+        sketch.update(chunk)
+    hists, edges, thresholds = sketch.histograms([0.8, 0.9])
+"""
+
+import numpy as np
+
+CHUNK_SIZE = 2**20
+
+
+def polar(X, out_r=None, out_theta=None, chunk_size=CHUNK_SIZE):
+    """
+    Radius |X| and angle arccos(X_1 / |X|), chunk by chunk.
+
+    Parameters
+    ----------
+    X : ndarray of shape (n, d)
+    out_r, out_theta : ndarray of shape (n,), optional
+        Output buffers
+
+    Returns
+    -------
+    r, theta : ndarray of shape (n,)
+    """
+    n = X.shape[0]
+    dtype = np.float32 if X.dtype == np.float32 else np.float64
+    r = np.empty(n, dtype) if out_r is None else out_r
+    theta = np.empty(n, dtype) if out_theta is None else out_theta
+    for start in range(0, n, chunk_size):
+        chunk = X[start:start + chunk_size]
+        r_chunk = r[start:start + chunk_size]
+        theta_chunk = theta[start:start + chunk_size]
+        if chunk.shape[1] == 2:
+            np.hypot(chunk[:, 0], chunk[:, 1], out=r_chunk)
+        else:
+            r_chunk[:] = np.linalg.norm(chunk, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            np.divide(chunk[:, 0], r_chunk, out=theta_chunk)
+        np.clip(theta_chunk, -1, 1, out=theta_chunk)
+        np.arccos(theta_chunk, out=theta_chunk)
+    return r, theta
+
+
+def theta_histograms(X, quantiles=(0.8, 0.9), bins=50, theta_range=(0, np.pi / 2),
+                     density=True):
+    """
+    Theta histograms above several radial quantiles of an in-memory sample.
+
+    Parameters
+    ----------
+    X : ndarray of shape (n, d)
+    quantiles : sequence of float
+        Radial quantile levels p; points with r above the p-quantile are kept
+    bins : int
+        Number of theta bins
+    theta_range : (float, float)
+        Range of the theta histograms
+    density : bool
+        Normalize each histogram to a probability density
+
+    Returns
+    -------
+    hists : ndarray of shape (len(quantiles), bins)
+    edges : ndarray of shape (bins + 1,)
+    thresholds : ndarray of shape (len(quantiles),)
+    """
+    r, theta = polar(X)
+    n = len(r)
+    kth = [min(int(q * n), n - 1) for q in quantiles]
+    partitioned = np.partition(r, kth)
+    thresholds = partitioned[kth]
+
+    edges = np.linspace(*theta_range, bins + 1)
+    hists = np.stack([np.histogram(theta[r > t], edges, density=density)[0]
+                      for t in thresholds])
+    return hists, edges, thresholds
+
+
+class AngularSketch:
+    """
+    Streaming joint histogram of (log r, theta).
+
+    Parameters
+    ----------
+    bins : int
+        Number of theta bins
+    theta_range : (float, float)
+        Range of theta; points outside only count for the radial quantiles
+    relative_accuracy : float
+        Relative width of the radius bins, i.e. accuracy of the thresholds
+    r_range : (float, float)
+        Radii below / above are counted in the first / last radius bin
+    """
+
+    def __init__(self, bins=50, theta_range=(0, np.pi / 2), relative_accuracy=1e-2,
+                 r_range=(1e-12, 1e12)):
+        self.bins = bins
+        self.theta_range = theta_range
+        self.log_r_min = np.log(r_range[0])
+        self.log_step = np.log1p(relative_accuracy)
+        self.n_radii = int(np.ceil((np.log(r_range[1]) - self.log_r_min) / self.log_step)) + 1
+        self.radial_counts = np.zeros(self.n_radii, dtype=np.int64)
+        self.counts = np.zeros((self.n_radii, bins), dtype=np.int64)
+        self.n = 0
+
+    def update(self, X, chunk_size=CHUNK_SIZE):
+        """Add the points of X, of shape (m, d), to the sketch."""
+        for start in range(0, X.shape[0], chunk_size):
+            r, theta = polar(X[start:start + chunk_size])
+            with np.errstate(divide='ignore'):
+                r_bin = np.log(r)
+            r_bin -= self.log_r_min
+            r_bin /= self.log_step
+            r_bin = np.clip(r_bin, 0, self.n_radii - 1).astype(np.intp)
+            self.radial_counts += np.bincount(r_bin, minlength=self.n_radii)
+
+            t_lo, t_hi = self.theta_range
+            t_bin = ((theta - t_lo) * (self.bins / (t_hi - t_lo))).astype(np.intp)
+            inside = (theta >= t_lo) & (theta <= t_hi)
+            np.minimum(t_bin, self.bins - 1, out=t_bin)
+            flat = r_bin[inside] * self.bins + t_bin[inside]
+            self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+            self.n += len(r)
+        return self
+
+    def radial_quantile(self, q):
+        """
+        p-quantile of the radius, up to the relative accuracy.
+
+        Returns
+        -------
+        threshold : float
+            Upper edge of the radius bin holding the quantile
+        r_bin : int
+            Index of that bin
+        """
+        cumulative = np.cumsum(self.radial_counts)
+        r_bin = int(np.searchsorted(cumulative, q * self.n, side='left'))
+        r_bin = min(r_bin, self.n_radii - 1)
+        return float(np.exp(self.log_r_min + (r_bin + 1) * self.log_step)), r_bin
+
+    def histograms(self, quantiles=(0.8, 0.9), density=True):
+        """
+        Theta histograms above several radial quantiles.
+
+        Bins entirely above the quantile are counted in full; the bin holding
+        the quantile contributes the fraction of its points needed to reach
+        (1 - p) n points.
+
+        Returns
+        -------
+        hists : ndarray of shape (len(quantiles), bins)
+        edges : ndarray of shape (bins + 1,)
+        thresholds : ndarray of shape (len(quantiles),)
+        """
+        above = np.cumsum(self.counts[::-1], axis=0)[::-1]
+        radial_above = np.cumsum(self.radial_counts[::-1])[::-1]
+        hists, thresholds = [], []
+        for q in quantiles:
+            threshold, r_bin = self.radial_quantile(q)
+            hist = above[r_bin + 1].astype(float) if r_bin + 1 < self.n_radii \
+                else np.zeros(self.bins)
+            in_bin = self.radial_counts[r_bin]
+            if in_bin:
+                n_above = radial_above[r_bin + 1] if r_bin + 1 < self.n_radii else 0
+                share = np.clip(((1 - q) * self.n - n_above) / in_bin, 0, 1)
+                hist += share * self.counts[r_bin]
+            hists.append(hist)
+            thresholds.append(threshold)
+
+        hists = np.array(hists)
+        edges = np.linspace(*self.theta_range, self.bins + 1)
+        if density:
+            hists /= np.maximum(hists.sum(axis=1, keepdims=True), 1) * np.diff(edges)
+        return hists, edges, np.array(thresholds)
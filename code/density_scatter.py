@@ -0,0 +1,206 @@
+"""
+Density-binned scatter rendering for panels with millions of points.
+
+A marker per point makes PDF export time and file size grow with n. Instead,
+`density_scatter` aggregates the points into a 2-D histogram (integer bin
+indices + np.bincount, in chunks, no sort), draws it as a single rasterized
+mesh, and draws as individual markers only the points of sparse bins (at
+most `sparse_count` points, lowered towards 1 above `max_outliers` markers),
+which are left out of the mesh. Isolated extremes stay visible as points,
+without picking the dense strips along the edges of a clipped panel. The
+number of markers is bounded by the number of bins, so render time and file
+size stay constant in n.
+
+For heavy-tailed positive data, `log_bins=True` uses log-spaced bins; counts
+are shown on a log color scale by default.
+
+`plot_points` is a drop-in for ax.scatter in the figure scripts: it keeps the
+plain scatter up to `max_points` points and switches to the density mode above.
+
+Example:
+    plot_points(ax, X[:, 0], X[:, 1], color='steelblue',
+                range=((0, 20), (0, 20)), s=12, alpha=0.6, edgecolors='none')
+"""
+
+import numpy as np
+from matplotlib.colors import LinearSegmentedColormap, LogNorm, to_rgb
+
+CHUNK_SIZE = 2**22
+
+
+def _bin_index(x, y, bins_x, bins_y, range, log_bins):
+    """Flat bin index (ix * bins_y + iy) of each point, -1 outside the range."""
+    (x_min, x_max), (y_min, y_max) = range
+    scale = np.log if log_bins else (lambda v: v)
+    x_lo, x_hi, y_lo, y_hi = scale(x_min), scale(x_max), scale(y_min), scale(y_max)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tx = scale(np.asarray(x, dtype=np.float64))
+        ty = scale(np.asarray(y, dtype=np.float64))
+    inside = (tx >= x_lo) & (tx < x_hi) & (ty >= y_lo) & (ty < y_hi)
+    ix = ((tx[inside] - x_lo) * (bins_x / (x_hi - x_lo))).astype(np.int64)
+    iy = ((ty[inside] - y_lo) * (bins_y / (y_hi - y_lo))).astype(np.int64)
+    np.minimum(ix, bins_x - 1, out=ix)
+    np.minimum(iy, bins_y - 1, out=iy)
+    flat = np.full(len(tx), -1, dtype=np.int64)
+    flat[inside] = ix * bins_y + iy
+    return flat
+
+
+def histogram2d(x, y, bins, range, log_bins=False, chunk_size=CHUNK_SIZE):
+    """
+    2-D histogram with uniform (or log-uniform) bins in one pass over the data.
+
+    Parameters
+    ----------
+    x, y : ndarray of shape (n,)
+        Coordinates
+    bins : int or (int, int)
+        Number of bins along x and y
+    range : ((xmin, xmax), (ymin, ymax))
+        Histogram range; points outside are ignored
+    log_bins : bool
+        Log-spaced bins (range must be positive)
+    chunk_size : int
+        Points processed per chunk
+
+    Returns
+    -------
+    counts : ndarray of shape (bins_x, bins_y)
+    x_edges, y_edges : ndarray
+    """
+    bins_x, bins_y = (bins, bins) if np.isscalar(bins) else bins
+    counts = np.zeros(bins_x * bins_y, dtype=np.int64)
+    for start in np.arange(0, len(x), chunk_size):
+        flat = _bin_index(x[start:start + chunk_size], y[start:start + chunk_size],
+                          bins_x, bins_y, range, log_bins)
+        counts += np.bincount(flat[flat >= 0], minlength=bins_x * bins_y)
+
+    (x_min, x_max), (y_min, y_max) = range
+    space = np.geomspace if log_bins else np.linspace
+    x_edges = space(x_min, x_max, bins_x + 1)
+    y_edges = space(y_min, y_max, bins_y + 1)
+    return counts.reshape(bins_x, bins_y), x_edges, y_edges
+
+
+def sparse_points(x, y, counts, range, log_bins=False, sparse_count=2, max_outliers=5000,
+                  chunk_size=CHUNK_SIZE):
+    """
+    Indices of the points falling in sparse bins of a 2-D histogram.
+
+    A bin is sparse if it holds between 1 and `sparse_count` points; the
+    cutoff is lowered, down to 1, while more than `max_outliers` points are
+    selected. Bins holding a single point are always sparse, so the number
+    of selected points stays bounded by the number of bins, whatever n.
+    Sparsity, unlike a norm threshold, does not pick the points that are
+    merely close to the edges of a clipped panel.
+
+    Parameters
+    ----------
+    counts : ndarray of shape (bins_x, bins_y)
+        Histogram of (x, y) over `range`, from histogram2d
+
+    Returns
+    -------
+    idx : ndarray of int
+        Indices of the points in sparse bins
+    sparse : ndarray of bool, shape (bins_x, bins_y)
+        Sparse bins
+    """
+    flat_counts = counts.ravel()
+    cutoff = sparse_count
+    while cutoff > 1 and flat_counts[flat_counts <= cutoff].sum() > max_outliers:
+        cutoff -= 1
+    sparse = (flat_counts > 0) & (flat_counts <= cutoff)
+
+    idx = []
+    if sparse.any():
+        for start in np.arange(0, len(x), chunk_size):
+            flat = _bin_index(x[start:start + chunk_size], y[start:start + chunk_size],
+                              *counts.shape, range, log_bins)
+            keep = flat >= 0
+            keep[keep] = sparse[flat[keep]]
+            idx.append(start + np.flatnonzero(keep))
+    idx = np.concatenate(idx) if idx else np.empty(0, dtype=np.int64)
+    return idx, sparse.reshape(counts.shape)
+
+
+def single_color_cmap(color):
+    """Colormap going from transparent to `color`, to overlay other layers."""
+    r, g, b = to_rgb(color)
+    return LinearSegmentedColormap.from_list('density', [(r, g, b, 0.45), (r, g, b, 1.0)])
+
+
+def density_scatter(ax, x, y, bins=200, range=None, log_bins=False, log_counts=True,
+                    color='steelblue', cmap=None, sparse_count=2, max_outliers=5000,
+                    **scatter_kwargs):
+    """
+    Draw a 2-D histogram of (x, y) as one image and overlay the sparse points.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+    x, y : ndarray of shape (n,)
+    bins : int or (int, int)
+        Number of bins
+    range : ((xmin, xmax), (ymin, ymax)), optional
+        Histogram range (data range if None)
+    log_bins : bool
+        Log-spaced bins for heavy-tailed positive data
+    log_counts : bool
+        Log color scale for the counts
+    color : color
+        Color of the individual points, and of the bins when cmap is None
+    cmap : Colormap, optional
+        Colormap of the bins
+    sparse_count : int
+        Points in bins with at most this count are drawn individually, and
+        those bins are left out of the image
+    max_outliers : int
+        Number of individually drawn points above which the cutoff is
+        lowered (single-point bins are always drawn individually)
+    **scatter_kwargs
+        Passed to ax.scatter for the individual points
+
+    Returns
+    -------
+    mesh : QuadMesh
+    points : PathCollection
+    """
+    x, y = np.asarray(x), np.asarray(y)
+    if range is None:
+        range = ((x.min(), np.nextafter(x.max(), np.inf)),
+                 (y.min(), np.nextafter(y.max(), np.inf)))
+
+    counts, x_edges, y_edges = histogram2d(x, y, bins, range, log_bins)
+    sparse_idx, sparse = sparse_points(x, y, counts, range, log_bins, sparse_count,
+                                       max_outliers)
+    counts[sparse] = 0
+    counts = np.ma.masked_equal(counts, 0)
+    norm = LogNorm(vmin=1, vmax=max(counts.max(), 2)) if log_counts else None
+    mesh = ax.pcolormesh(x_edges, y_edges, counts.T, cmap=cmap or single_color_cmap(color),
+                         norm=norm, rasterized=True, shading='flat')
+    points = ax.scatter(x[sparse_idx], y[sparse_idx], c=color, **scatter_kwargs)
+    return mesh, points
+
+
+def plot_points(ax, x, y, mode='auto', max_points=100_000, color='steelblue',
+                range=None, **kwargs):
+    """
+    Scatter plot, or density-binned plot for large samples.
+
+    Parameters
+    ----------
+    mode : {'auto', 'scatter', 'density'}
+        'auto' draws a plain scatter up to `max_points` points
+    range : ((xmin, xmax), (ymin, ymax)), optional
+        Panel range used by the density mode
+    **kwargs
+        Scatter keyword arguments (s, alpha, edgecolors, ...); in density
+        mode, density_scatter keywords (bins, log_bins, ...) are also accepted
+    """
+    if mode == 'scatter' or (mode == 'auto' and len(x) <= max_points):
+        density_keys = ('bins', 'log_bins', 'log_counts', 'cmap', 'sparse_count',
+                        'max_outliers')
+        kwargs = {k: v for k, v in kwargs.items() if k not in density_keys}
+        return ax.scatter(x, y, c=color, **kwargs)
+    return density_scatter(ax, x, y, range=range, color=color, **kwargs)
@@ -0,0 +1,323 @@
+"""
+Empirical marginal CDFs and their inverses for HTGAN marginal normalization.
+
+Algorithm 1 of Chapter 3 maps each margin to a Pareto scale through an
+estimated cdf F_j, X~_j = (1 / (1 - F_j(X_j)))^gamma, and Algorithm 2 maps
+generated points back with F_j^{-1}. Here F_j is the empirical cdf:
+
+- `fit` sorts each column once and keeps the order statistics (optionally
+  thinned to `n_knots` empirical quantiles) as a (d, n_knots) table whose
+  levels form the uniform grid (k + 1) / (n_knots + 1);
+- `cdf` applies np.interp (searchsorted + linear interpolation) column by
+  column; `quantile`, used on generated batches, exploits the uniform grid
+  to locate the interpolation interval of all columns arithmetically and
+  gathers the knots in one vectorized pass per chunk of rows;
+- both write into an `out=` buffer, so batches can be mapped in a stream;
+  `transform` and `inverse_transform` work on the survival 1 - F in float64
+  chunks, so extrapolated tail levels survive float32 inputs;
+- outside the range of the knots, a Pareto-type (GPD) tail with index
+  gamma_j is glued to the extreme knots, so generated extremes beyond the data
+  are extrapolated instead of clipped.
+
+Example:
+    margins = EmpiricalMargins().fit(returns)             # (n, d) data
+    X_tilde = margins.transform(returns, gamma=1 / 2.5)    # Algorithm 1
+    X_hat = margins.inverse_transform(G(Z), gamma=1 / 2.5) # Algorithm 2
+"""
+
+import numpy as np
+
+
+def hill_estimator(sorted_tail):
+    """
+    Hill estimator of the tail index gamma, row-wise.
+
+    Parameters
+    ----------
+    sorted_tail : ndarray of shape (d, k + 1)
+        Increasing positive values: the threshold followed by the k exceedances
+
+    Returns
+    -------
+    gamma : ndarray of shape (d,)
+    """
+    log_tail = np.log(np.maximum(sorted_tail, np.finfo(float).tiny))
+    return np.mean(log_tail[:, 1:], axis=1) - log_tail[:, 0]
+
+
+class EmpiricalMargins:
+    """
+    Empirical marginal cdfs with linear interpolation and Pareto-type tails.
+
+    Parameters
+    ----------
+    n_knots : int, optional
+        Number of quantile knots kept per column (all order statistics if None)
+    tail : {'pareto', None}
+        Extrapolation beyond the extreme knots; None clips to their range
+    tail_index : float or ndarray of shape (d,), optional
+        Tail index gamma of both tails; estimated per column and per side
+        with the Hill estimator if None
+    k_tail : int, optional
+        Number of order statistics used by the tail fit (5% of n by default)
+    chunk_rows : int
+        Rows per vectorized chunk in `quantile` (bounds the temporaries)
+    """
+
+    def __init__(self, n_knots=None, tail='pareto', tail_index=None, k_tail=None,
+                 chunk_rows=4096):
+        self.n_knots = n_knots
+        self.tail = tail
+        self.tail_index = tail_index
+        self.k_tail = k_tail
+        self.chunk_rows = chunk_rows
+
+    def fit(self, X):
+        """
+        Sort each column of X once and store the interpolation tables.
+
+        Parameters
+        ----------
+        X : ndarray of shape (n, d)
+            Training data
+
+        Returns
+        -------
+        self
+        """
+        X = np.asarray(X, dtype=np.float64)
+        n, d = X.shape
+        sorted_X = np.sort(X.T, axis=1)
+        # Plotting positions i / (n + 1) keep F strictly inside (0, 1)
+        levels = np.arange(1, n + 1) / (n + 1)
+
+        if self.n_knots is not None and self.n_knots < n:
+            # Empirical quantiles on the uniform grid (k + 1) / (n_knots + 1)
+            knot_levels = np.arange(1, self.n_knots + 1) / (self.n_knots + 1)
+            pos = knot_levels * (n + 1) - 1
+            lo = np.clip(np.floor(pos).astype(int), 0, n - 2)
+            weight = np.clip(pos - lo, 0, 1)
+            tables = sorted_X[:, lo] + weight * (sorted_X[:, lo + 1] - sorted_X[:, lo])
+        else:
+            knot_levels, tables = levels, sorted_X
+        self.tables_ = np.ascontiguousarray(tables)
+        self.levels_ = knot_levels
+        self.level_min_ = levels[0]
+
+        if self.tail == 'pareto':
+            self._fit_tails(sorted_X)
+        return self
+
+    def _fit_tails(self, sorted_X):
+        """
+        Glue GPD tails to the extreme knots.
+
+        Upper tail, for x above the last knot x_K:
+            1 - F(x) = S_u (1 + gamma (x - u) / sigma)^(-1/gamma)
+        with u the knot k_tail points below the top, S_u = 1 - F(u), and sigma
+        chosen so that the curve passes through (x_K, 1 - F(x_K)). The lower
+        tail is the mirror image. The tail indices use all order statistics.
+        """
+        d, n = sorted_X.shape
+        k = self.k_tail or max(2, int(0.05 * n))
+        if 2 * k + 1 > n:
+            raise ValueError(f"k_tail={k} too large for n={n} samples")
+        median = sorted_X[:, n // 2]
+
+        if self.tail_index is None:
+            gamma_hi = hill_estimator(sorted_X[:, n - k - 1:] - median[:, None])
+            gamma_lo = hill_estimator(median[:, None] - sorted_X[:, k::-1])
+        else:
+            gamma_hi = gamma_lo = np.broadcast_to(np.asarray(self.tail_index, float), (d,))
+        self.gamma_hi_ = np.maximum(gamma_hi, 1e-3)
+        self.gamma_lo_ = np.maximum(gamma_lo, 1e-3)
+
+        # Same tail fraction k / n, expressed on the knot grid
+        tables, levels = self.tables_, self.levels_
+        n_knots = levels.size
+        k = max(1, round(k * (n_knots + 1) / (n + 1)))
+        self.u_hi_, self.s_hi_ = tables[:, n_knots - k - 1], 1 - levels[n_knots - k - 1]
+        self.u_lo_, self.s_lo_ = tables[:, k], levels[k]
+        ratio_hi = self.s_hi_ / (1 - levels[-1])
+        ratio_lo = self.s_lo_ / levels[0]
+        spread_hi = np.maximum(tables[:, -1] - self.u_hi_, 1e-12)
+        spread_lo = np.maximum(self.u_lo_ - tables[:, 0], 1e-12)
+        self.sigma_hi_ = self.gamma_hi_ * spread_hi / (ratio_hi ** self.gamma_hi_ - 1)
+        self.sigma_lo_ = self.gamma_lo_ * spread_lo / (ratio_lo ** self.gamma_lo_ - 1)
+
+    @staticmethod
+    def _output(X, out):
+        X = np.asarray(X)
+        if out is None:
+            dtype = np.float32 if X.dtype == np.float32 else np.float64
+            out = np.empty(X.shape, dtype=dtype)
+        return X, out
+
+    def _upper_survival(self, j, x):
+        """1 - F_j(x) above the top knot, from the GPD tail, without cancellation."""
+        g, s = self.gamma_hi_[j], self.sigma_hi_[j]
+        return self.s_hi_ * (1 + g * (x - self.u_hi_[j]) / s) ** (-1 / g)
+
+    def _lower_cdf(self, j, x):
+        """F_j(x) below the bottom knot, from the GPD tail."""
+        g, s = self.gamma_lo_[j], self.sigma_lo_[j]
+        return self.s_lo_ * (1 + g * (self.u_lo_[j] - x) / s) ** (-1 / g)
+
+    def cdf(self, X, out=None):
+        """
+        Apply F_1, ..., F_d column-wise.
+
+        Parameters
+        ----------
+        X : ndarray of shape (m, d)
+            Points on the original scale
+        out : ndarray of shape (m, d), optional
+            Output buffer (may be X itself)
+
+        Returns
+        -------
+        U : ndarray of shape (m, d)
+            Values in (0, 1)
+        """
+        X, out = self._output(X, out)
+        for j in range(self.tables_.shape[0]):
+            x = X[:, j]
+            table = self.tables_[j]
+            if self.tail == 'pareto':
+                # Tail values first: out may alias X
+                above, below = x > table[-1], x < table[0]
+                x_hi, x_lo = x[above], x[below]
+            out[:, j] = np.interp(x, table, self.levels_)
+            if self.tail != 'pareto':
+                continue
+            if x_hi.size:
+                out[above, j] = 1 - self._upper_survival(j, x_hi)
+            if x_lo.size:
+                out[below, j] = self._lower_cdf(j, x_lo)
+        return out
+
+    def _survival_chunk(self, x):
+        """
+        Survival 1 - F of a (rows, d) chunk, in float64.
+
+        The upper tail is computed directly from the GPD tail: going through
+        F and 1 - F loses it once F rounds to 1 (above 1 - 2^-24 in float32).
+        """
+        x = np.asarray(x, dtype=np.float64)
+        survival = np.empty(x.shape)
+        for j in range(self.tables_.shape[0]):
+            col = x[:, j]
+            table = self.tables_[j]
+            survival[:, j] = 1 - np.interp(col, table, self.levels_)
+            if self.tail != 'pareto':
+                continue
+            above, below = col > table[-1], col < table[0]
+            if above.any():
+                survival[above, j] = self._upper_survival(j, col[above])
+            if below.any():
+                survival[below, j] = 1 - self._lower_cdf(j, col[below])
+        return survival
+
+    def quantile(self, U, out=None):
+        """
+        Apply F_1^{-1}, ..., F_d^{-1} column-wise, in chunks of rows.
+
+        Parameters
+        ----------
+        U : ndarray of shape (m, d)
+            Levels in [0, 1]
+        out : ndarray of shape (m, d), optional
+            Output buffer (may be U itself)
+
+        Returns
+        -------
+        X : ndarray of shape (m, d)
+            Points on the original scale
+        """
+        U, out = self._output(U, out)
+        for start in range(0, U.shape[0], self.chunk_rows):
+            stop = start + self.chunk_rows
+            out[start:stop] = self._quantile_chunk(U[start:stop])
+        return out
+
+    def _quantile_chunk(self, u, survival=None):
+        """
+        Quantiles of a (rows, d) chunk in one vectorized pass.
+
+        Knots sit on the uniform grid (k + 1) / (n_knots + 1), shared by all
+        columns, so the interpolation interval of every entry is computed
+        arithmetically (no search) and the knot values are gathered from the
+        flattened (d, n_knots) table. If given, `survival` = 1 - u (float64)
+        is used by the upper tail instead of recomputing 1 - u.
+        """
+        n_knots = self.levels_.size
+        u = np.asarray(u, dtype=np.float64)
+        pos = u * (n_knots + 1) - 1
+        lo = np.floor(pos).astype(np.intp)
+        np.clip(lo, 0, n_knots - 2, out=lo)
+        weight = pos - lo
+        np.clip(weight, 0, 1, out=weight)
+        lo += np.arange(u.shape[1]) * n_knots
+        table = self.tables_.ravel()
+        x_lo = table[lo]
+        x = table[lo + 1]
+        x -= x_lo
+        x *= weight
+        x += x_lo
+
+        if self.tail == 'pareto':
+            rows, cols = np.nonzero(u > self.levels_[-1])
+            if rows.size:
+                g, s = self.gamma_hi_[cols], self.sigma_hi_[cols]
+                tail = 1 - u[rows, cols] if survival is None else survival[rows, cols]
+                with np.errstate(divide='ignore'):
+                    ratio = self.s_hi_ / tail
+                x[rows, cols] = self.u_hi_[cols] + s / g * (ratio ** g - 1)
+            rows, cols = np.nonzero(u < self.levels_[0])
+            if rows.size:
+                g, s = self.gamma_lo_[cols], self.sigma_lo_[cols]
+                with np.errstate(divide='ignore'):
+                    ratio = self.s_lo_ / u[rows, cols]
+                x[rows, cols] = self.u_lo_[cols] - s / g * (ratio ** g - 1)
+        return x
+
+    def transform(self, X, gamma, out=None):
+        """
+        Renormalization step of Algorithm 1: X~ = (1 / (1 - F(X)))^gamma.
+
+        Returns
+        -------
+        X_tilde : ndarray of shape (m, d)
+            Data with Pareto(1 / gamma) margins
+        """
+        X, out = self._output(X, out)
+        for start in range(0, X.shape[0], self.chunk_rows):
+            stop = start + self.chunk_rows
+            # Survival in float64, then X~ = survival^(-gamma)
+            survival = self._survival_chunk(X[start:stop])
+            survival **= -gamma
+            out[start:stop] = survival
+        return out
+
+    def inverse_transform(self, X_tilde, gamma, out=None):
+        """
+        Back-transform of Algorithm 2: X^ = F^{-1}(1 - X~^(-1/gamma)).
+
+        Returns
+        -------
+        X_hat : ndarray of shape (m, d)
+            Points on the original scale
+        """
+        X_tilde, out = self._output(X_tilde, out)
+        for start in range(0, X_tilde.shape[0], self.chunk_rows):
+            stop = start + self.chunk_rows
+            # Survival X~^(-1/gamma) in float64: going through the level
+            # u = 1 - X~^(-1/gamma) and back to 1 - u loses the extrapolated
+            # tail, all the more in float32. Generated values below the
+            # Pareto support (X~ < 1) carry no tail information: send them
+            # to the sample minimum rather than -inf
+            survival = np.maximum(np.asarray(X_tilde[start:stop], dtype=np.float64), 1)
+            survival **= -1 / gamma
+            np.minimum(survival, 1 - self.level_min_, out=survival)
+            out[start:stop] = self._quantile_chunk(1 - survival, survival)
+        return out
@@ -17,6 +17,8 @@ import matplotlib.pyplot as plt
 from matplotlib.patches import FancyArrowPatch
 from scipy.stats import multivariate_normal
 
+from density_scatter import plot_points
+
 # Set seed for reproducibility
 np.random.seed(123)
 
@@ -116,6 +118,7 @@ fig, axes = plt.subplots(2, n_timesteps, figsize=(12, 6.5))
 
 # Style settings
 scatter_kwargs = dict(s=6, alpha=0.7, edgecolors='none')
+scatter_mode = 'auto'  # 'scatter', 'density' or 'auto' (density above 10^5 points)
 xlim, ylim = (-4.5, 4.5), (-4.5, 4.5)
 
 # Colors: blue for data, gray for noise, gradient in between
@@ -132,7 +135,8 @@ for i, (t, x_t) in enumerate(zip(timesteps, forward_snapshots)):
     ax.contour(x_grid, y_grid, density, levels=5, colors='steelblue', alpha=0.5, linewidths=0.5)
 
     # Plot samples on top
-    ax.scatter(x_t[:, 0], x_t[:, 1], c='black', **scatter_kwargs)
+    plot_points(ax, x_t[:, 0], x_t[:, 1], mode=scatter_mode, color='black',
+                range=(xlim, ylim), **scatter_kwargs)
 
     ax.set_xlim(xlim)
     ax.set_ylim(ylim)
@@ -167,7 +171,8 @@ for i, (t, x_t) in enumerate(zip(timesteps[::-1], reverse_snapshots)):
     ax.contour(x_grid, y_grid, density, levels=5, colors='firebrick', alpha=0.5, linewidths=0.5)
 
     # Plot samples on top
-    ax.scatter(x_t[:, 0], x_t[:, 1], c='black', **scatter_kwargs)
+    plot_points(ax, x_t[:, 0], x_t[:, 1], mode=scatter_mode, color='black',
+                range=(xlim, ylim), **scatter_kwargs)
 
     ax.set_xlim(xlim)
     ax.set_ylim(ylim)
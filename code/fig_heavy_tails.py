@@ -4,7 +4,11 @@ Generate heavy-tailed vs light-tailed density comparison.
 Shows |Gaussian|, exponential (light-tailed) vs Pareto (heavy-tailed) densities,
 illustrating why extreme values are far more likely under heavy tails.
 
-Output: figures/intro/heavy_tails.pdf
+Output: figures/intro/heavy_tails.pdf, figures/intro/heavy_tails_table.tex
+(exceedance probabilities at the table thresholds)
+
+The figure can be rendered for a grid of (alpha, lam, sigma) with sweep.py:
+    python sweep.py heavy_tails --grid alpha=1.5,2.0,2.5 lam=0.5,1.0
 """
 
 import matplotlib
@@ -12,80 +16,116 @@ matplotlib.use('Agg')
 
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy import stats
 
-# Create figure with two subplots stacked vertically, full width
-fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 9), sharex=True)
+from tail_probability import exceedance_table, log_density, log_survival
 
 # Parameters
 alpha = 1.5  # Pareto shape (heavier tail than alpha=2)
 lam = 1.0    # Exponential rate
 sigma = 1.0  # Gaussian std
-
-# x range for both plots
-x = np.linspace(0.01, 20, 2000)
-
-# Half-normal (|Gaussian|): f(x) = 2/sqrt(2*pi*sigma^2) * exp(-x^2/(2*sigma^2)) for x >= 0
-half_normal_density = 2 * stats.norm.pdf(x, 0, sigma)
-
-# Exponential: f(x) = lambda * exp(-lambda * x)
-exp_density = lam * np.exp(-lam * x)
-
-# Pareto (shifted to start at 0): f(x) = alpha / (1+x)^(alpha+1)
-pareto_density = alpha / (1 + x)**(alpha + 1)
-
-# Top plot: densities
-ax1.plot(x, half_normal_density, 'g-', lw=2.5, label=r'$|$Gaussian$|$ ($\sigma=1$)')
-ax1.plot(x, exp_density, 'b-', lw=2.5, label=r'Exponential ($\lambda=1$)')
-ax1.plot(x, pareto_density, 'r-', lw=2.5, label=r'Pareto ($\alpha=1.5$)')
-
-ax1.set_ylabel('Density $f(x)$', fontsize=12)
-ax1.set_xlim(0, 20)
-ax1.set_ylim(0, 0.15)
-ax1.legend(fontsize=11, loc='upper right')
-ax1.set_title('Density comparison', fontsize=12)
-ax1.grid(True, alpha=0.3)
-
-# Bottom plot: log-scale survival functions (tail probabilities)
-# Survival functions P(X > x)
-half_normal_survival = 2 * (1 - stats.norm.cdf(x, 0, sigma))
-exp_survival = np.exp(-lam * x)
-pareto_survival = 1 / (1 + x)**alpha
-
-ax2.semilogy(x, half_normal_survival, 'g-', lw=2.5, label=r'$|$Gaussian$|$')
-ax2.semilogy(x, exp_survival, 'b-', lw=2.5, label=r'Exponential')
-ax2.semilogy(x, pareto_survival, 'r-', lw=2.5, label=r'Pareto')
-
-ax2.set_xlabel('$x$', fontsize=12)
-ax2.set_ylabel(r'Tail probability $\mathbb{P}(X > x)$', fontsize=12)
-ax2.set_xlim(0, 20)
-ax2.set_ylim(1e-15, 1)
-ax2.legend(fontsize=11, loc='upper right')
-ax2.set_title('Tail probability (log scale)', fontsize=12)
-ax2.grid(True, alpha=0.3, which='both')
-
-# Add vertical lines at key thresholds
-for t in [5, 10, 15]:
-    ax1.axvline(x=t, color='gray', linestyle='--', alpha=0.4, lw=1)
-    ax2.axvline(x=t, color='gray', linestyle='--', alpha=0.4, lw=1)
-
-plt.tight_layout()
-
-# Save figure
-output_path = '../figures/intro/heavy_tails.pdf'
-plt.savefig(output_path, bbox_inches='tight', dpi=300)
-print(f"Figure saved to {output_path}")
-
-plt.savefig(output_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=150)
-print(f"Preview saved to {output_path.replace('.pdf', '.png')}")
-
-# Print table values
-print("\nTable: Probability of exceeding threshold t")
-print("-" * 65)
-print(f"{'t':>6} | {'|Gaussian|':>15} | {'Exponential':>15} | {'Pareto':>15}")
-print("-" * 65)
-for t in [3, 5, 8, 10]:
-    gauss_p = 2 * (1 - stats.norm.cdf(t, 0, sigma))
-    exp_p = np.exp(-lam * t)
-    par_p = 1 / (1 + t)**alpha
-    print(f"{t:>6} | {gauss_p:>15.2e} | {exp_p:>15.2e} | {par_p:>15.2e}")
+thresholds = (3, 5, 8, 10)  # Rows of the exceedance table
+
+DEFAULTS = dict(alpha=alpha, lam=lam, sigma=sigma)
+OUTPUT_PATH = '../figures/intro/heavy_tails.pdf'
+
+
+def render(output_path=OUTPUT_PATH, alpha=alpha, lam=lam, sigma=sigma):
+    """
+    Draw the figure, save it to `output_path` (PDF) plus a PNG preview, and
+    print the exceedance table and save it as LaTeX next to the figure.
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+    """
+    # Create figure with two subplots stacked vertically, full width
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 9), sharex=True)
+
+    # x range for both plots
+    x = np.linspace(0.01, 20, 2000)
+
+    # Half-normal (|Gaussian|), exponential and Pareto shifted to start at 0:
+    # f(x) = alpha / (1+x)^(alpha+1), evaluated in log space
+    half_normal_density = np.exp(log_density('half_normal', x, sigma=sigma))
+    exp_density = np.exp(log_density('exponential', x, lam=lam))
+    pareto_density = np.exp(log_density('pareto', x, alpha=alpha))
+
+    # Top plot: densities
+    ax1.plot(x, half_normal_density, 'g-', lw=2.5, label=rf'$|$Gaussian$|$ ($\sigma={sigma:g}$)')
+    ax1.plot(x, exp_density, 'b-', lw=2.5, label=rf'Exponential ($\lambda={lam:g}$)')
+    ax1.plot(x, pareto_density, 'r-', lw=2.5, label=rf'Pareto ($\alpha={alpha:g}$)')
+
+    ax1.set_ylabel('Density $f(x)$', fontsize=12)
+    ax1.set_xlim(0, 20)
+    ax1.set_ylim(0, 0.15)
+    ax1.legend(fontsize=11, loc='upper right')
+    ax1.set_title('Density comparison', fontsize=12)
+    ax1.grid(True, alpha=0.3)
+
+    # Bottom plot: log-scale survival functions (tail probabilities)
+    # Survival functions P(X > x), from log P(X > x) (no 1 - cdf underflow)
+    half_normal_survival = np.exp(log_survival('half_normal', x, sigma=sigma))
+    exp_survival = np.exp(log_survival('exponential', x, lam=lam))
+    pareto_survival = np.exp(log_survival('pareto', x, alpha=alpha))
+
+    ax2.semilogy(x, half_normal_survival, 'g-', lw=2.5, label=r'$|$Gaussian$|$')
+    ax2.semilogy(x, exp_survival, 'b-', lw=2.5, label=r'Exponential')
+    ax2.semilogy(x, pareto_survival, 'r-', lw=2.5, label=r'Pareto')
+
+    ax2.set_xlabel('$x$', fontsize=12)
+    ax2.set_ylabel(r'Tail probability $\mathbb{P}(X > x)$', fontsize=12)
+    ax2.set_xlim(0, 20)
+    ax2.set_ylim(1e-15, 1)
+    ax2.legend(fontsize=11, loc='upper right')
+    ax2.set_title('Tail probability (log scale)', fontsize=12)
+    ax2.grid(True, alpha=0.3, which='both')
+
+    # Add vertical lines at key thresholds
+    for t in [5, 10, 15]:
+        ax1.axvline(x=t, color='gray', linestyle='--', alpha=0.4, lw=1)
+        ax2.axvline(x=t, color='gray', linestyle='--', alpha=0.4, lw=1)
+
+    plt.tight_layout()
+
+    # Save figure
+    fig.savefig(output_path, bbox_inches='tight', dpi=300)
+    print(f"Figure saved to {output_path}")
+
+    fig.savefig(output_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=150)
+    print(f"Preview saved to {output_path.replace('.pdf', '.png')}")
+
+    # Exceedance table, all thresholds of a family in one call
+    columns = {
+        r'$|$Gaussian$|$': log_survival('half_normal', thresholds, sigma=sigma),
+        'Exponential': log_survival('exponential', thresholds, lam=lam),
+        'Pareto': log_survival('pareto', thresholds, alpha=alpha),
+    }
+    print("\nTable: Probability of exceeding threshold t")
+    print("-" * 65)
+    print(f"{'t':>6} | {'|Gaussian|':>15} | {'Exponential':>15} | {'Pareto':>15}")
+    print("-" * 65)
+    for i, t in enumerate(thresholds):
+        gauss_p, exp_p, par_p = (np.exp(log_sf[i]) for log_sf in columns.values())
+        print(f"{t:>6} | {gauss_p:>15.2e} | {exp_p:>15.2e} | {par_p:>15.2e}")
+
+    table_path = output_path.replace('.pdf', '_table.tex')
+    with open(table_path, 'w') as f:
+        f.write(exceedance_table(thresholds, columns))
+    print(f"Table saved to {table_path}")
+
+    return fig
+
+
+def alpha_table(alphas, thresholds=thresholds, sigma=sigma):
+    """
+    LaTeX exceedance table of Pareto(alpha) for several alpha, with the
+    |Gaussian| as reference; all alphas come from one broadcasted call.
+    """
+    log_sf = log_survival('pareto', thresholds, alpha=alphas)
+    columns = {r'$|$Gaussian$|$': log_survival('half_normal', thresholds, sigma=sigma)}
+    columns.update({rf'Pareto ($\alpha={a:g}$)': row for a, row in zip(alphas, log_sf)})
+    return exceedance_table(thresholds, columns)
+
+
+if __name__ == '__main__':
+    render()
@@ -6,22 +6,60 @@ Compares:
 - Right panel: Gumbel copula with Pareto margins (upper tail dependence)
 
 Output: figures/intro/tail_dependence.pdf
+
+The figure can be rendered for a grid of (alpha, theta, n) with sweep.py:
+    python sweep.py tail_dependence --grid alpha=1.5,2.5 theta=1.33,2.0,4.0
 """
 
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import pareto
+from matplotlib.patches import Rectangle
 
-# Set seed for reproducibility
-np.random.seed(42)
+from density_scatter import plot_points
+from margins import pareto_quantile
+from sample_cache import cached
+from stdf import EmpiricalStdf
 
 # Parameters
 n = 500
 alpha = 1.5  # Pareto tail index (shape parameter) - consistent with heavy_tails figure
 theta = 2.5  # Gumbel copula parameter (theta > 1 for dependence)
+seed = 42    # Seed for reproducibility
+
+DEFAULTS = dict(n=n, alpha=alpha, theta=theta)
+OUTPUT_PATH = '../figures/intro/tail_dependence.pdf'
+
+
+def base_draws(n_sample, seed, dim=2):
+    """
+    Parameter-free draws used by the Marshall-Olkin sampler.
+
+    Parameters
+    ----------
+    n_sample : int
+        Number of draws per variable
+    seed : int
+        Seed of the random generator
+    dim : int
+        Dimension of the copula
+
+    Returns
+    -------
+    draws : ndarray of shape (2 + dim, n_sample)
+        Rows: W1 ~ U(0, pi), W2 ~ Exp(1), E1, ..., E_dim ~ Exp(1)
+    """
+    rng = np.random.default_rng([seed, 0])
+    return np.stack([rng.uniform(1e-10, np.pi - 1e-10, n_sample)]  # Avoid boundary issues
+                    + [rng.exponential(1, n_sample) for _ in range(1 + dim)])
+
 
+def independent_uniforms(n, seed):
+    """Independent uniforms of shape (n, 2), pushed through the Pareto quantile."""
+    rng = np.random.default_rng([seed, 1])
+    return rng.uniform(size=(n, 2))
 
-def gumbel_copula_sample(n, theta):
+
+def gumbel_copula_sample(n, theta, draws=None, dim=2):
     """
     Sample from Gumbel copula using Marshall-Olkin algorithm.
 
@@ -31,125 +69,195 @@ def gumbel_copula_sample(n, theta):
         Number of samples
     theta : float
         Gumbel parameter (theta >= 1, theta=1 is independence)
+    draws : ndarray of shape (2 + dim, n_sample), optional
+        Base draws (W1, W2, E1, ..., E_dim) as returned by `base_draws`, with
+        n_sample >= 1.5 * n. Drawn from the global numpy state if None.
+    dim : int
+        Dimension of the copula (ignored when draws are given)
 
     Returns
     -------
-    U : ndarray of shape (n, 2)
+    U : ndarray of shape (n, dim)
         Samples with uniform margins and Gumbel dependence
     """
     # Marshall-Olkin: sample from stable distribution
     # For Gumbel, use the algorithm based on stable(1/theta)
 
-    # Sample V from stable distribution with alpha = 1/theta
-    # Using the Chambers-Mallows-Stuck algorithm for stable(1/theta, 1, 0, 0)
+    # Sample V from the positive stable distribution with alpha = 1/theta,
+    # Laplace transform exp(-t^alpha), using Kanter's representation
     alpha_stable = 1.0 / theta
 
-    # Oversample to handle potential NaN values
-    n_sample = int(n * 1.5)
+    if draws is None:
+        # Oversample to handle potential NaN values
+        n_sample = int(n * 1.5)
 
-    W1 = np.random.uniform(1e-10, np.pi - 1e-10, n_sample)  # Avoid boundary issues
-    W2 = np.random.exponential(1, n_sample)
+        W1 = np.random.uniform(1e-10, np.pi - 1e-10, n_sample)  # Avoid boundary issues
+        W2 = np.random.exponential(1, n_sample)
+
+        # Sample independent exponentials
+        E = np.random.exponential(1, (dim, n_sample))
+    else:
+        W1, W2, E = draws[0], draws[1], draws[2:]
 
     if alpha_stable == 1:
-        V = np.tan(W1)
+        V = np.ones_like(W1)
     else:
         with np.errstate(invalid='ignore', divide='ignore'):
-            V = (np.sin(alpha_stable * W1) / (np.cos(W1) ** (1/alpha_stable))) * \
-                (np.cos(W1 - alpha_stable * W1) / W2) ** ((1 - alpha_stable) / alpha_stable)
-
-    # Sample independent exponentials
-    E1 = np.random.exponential(1, n_sample)
-    E2 = np.random.exponential(1, n_sample)
+            V = (np.sin(alpha_stable * W1) / (np.sin(W1) ** (1/alpha_stable))) * \
+                (np.sin((1 - alpha_stable) * W1) / W2) ** ((1 - alpha_stable) / alpha_stable)
 
     # Transform to Gumbel copula
     with np.errstate(invalid='ignore', divide='ignore'):
-        U1 = np.exp(-(E1 / V) ** (1/theta))
-        U2 = np.exp(-(E2 / V) ** (1/theta))
+        U = np.exp(-(E / V) ** (1/theta))
 
     # Filter out NaN values and take first n valid samples
-    valid = np.isfinite(U1) & np.isfinite(U2) & (U1 > 0) & (U1 < 1) & (U2 > 0) & (U2 < 1)
-    U1, U2 = U1[valid][:n], U2[valid][:n]
-
-    return np.column_stack([U1, U2])
-
-
-# Generate samples
-# Panel 1: Independent Pareto margins
-X1_indep = pareto.rvs(alpha, size=n)
-X2_indep = pareto.rvs(alpha, size=n)
-
-# Panel 2: Gumbel copula with Pareto margins (has upper tail dependence)
-U = gumbel_copula_sample(n, theta)
-X1_dep = pareto.ppf(U[:, 0], alpha)
-X2_dep = pareto.ppf(U[:, 1], alpha)
-
-# Plotting
-fig, axes = plt.subplots(1, 2, figsize=(10, 4.5))
-
-# Style settings
-scatter_kwargs = dict(s=12, alpha=0.6, edgecolors='none')
-xlim, ylim = (0, 20), (0, 20)
-box_color = 'red'
-box_alpha = 0.15
-box_edge = 'red'
-box_linestyle = '--'
-box_linewidth = 1.5
-
-# Threshold for "extreme" region (upper tail)
-tail_threshold = 10
-
-# Left panel: Independent
-ax = axes[0]
-ax.scatter(X1_indep, X2_indep, c='steelblue', **scatter_kwargs)
-ax.set_xlabel(r'$X_1$', fontsize=12)
-ax.set_ylabel(r'$X_2$', fontsize=12)
-ax.set_title('No tail dependence\n(independent Pareto margins)', fontsize=11)
-ax.set_xlim(xlim)
-ax.set_ylim(ylim)
-
-# Add box highlighting upper tail region (should be sparse)
-from matplotlib.patches import Rectangle
-rect = Rectangle((tail_threshold, tail_threshold),
-                 xlim[1] - tail_threshold, ylim[1] - tail_threshold,
-                 linewidth=box_linewidth, linestyle=box_linestyle,
-                 edgecolor=box_edge, facecolor=box_color, alpha=box_alpha)
-ax.add_patch(rect)
-
-# Count points in tail region
-n_tail_indep = np.sum((X1_indep > tail_threshold) & (X2_indep > tail_threshold))
-ax.text(xlim[1] - 1, ylim[1] - 1, f'n={n_tail_indep}', ha='right', va='top',
-        fontsize=9, color='red')
-
-# Right panel: Gumbel copula (tail dependent)
-ax = axes[1]
-ax.scatter(X1_dep, X2_dep, c='steelblue', **scatter_kwargs)
-ax.set_xlabel(r'$X_1$', fontsize=12)
-ax.set_ylabel(r'$X_2$', fontsize=12)
-ax.set_title('Upper tail dependence\n(Gumbel copula, Pareto margins)', fontsize=11)
-ax.set_xlim(xlim)
-ax.set_ylim(ylim)
-
-# Add box highlighting upper tail region (should have clustering)
-rect = Rectangle((tail_threshold, tail_threshold),
-                 xlim[1] - tail_threshold, ylim[1] - tail_threshold,
-                 linewidth=box_linewidth, linestyle=box_linestyle,
-                 edgecolor=box_edge, facecolor=box_color, alpha=box_alpha)
-ax.add_patch(rect)
-
-# Count points in tail region
-n_tail_dep = np.sum((X1_dep > tail_threshold) & (X2_dep > tail_threshold))
-ax.text(xlim[1] - 1, ylim[1] - 1, f'n={n_tail_dep}', ha='right', va='top',
-        fontsize=9, color='red')
-
-plt.tight_layout()
-
-# Save figure
-output_path = '../figures/intro/tail_dependence.pdf'
-plt.savefig(output_path, bbox_inches='tight', dpi=300)
-print(f"Figure saved to {output_path}")
-
-# Also save as PNG for quick preview
-plt.savefig(output_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=150)
-print(f"Preview saved to {output_path.replace('.pdf', '.png')}")
-
-plt.show()
+    valid = np.all(np.isfinite(U) & (U > 0) & (U < 1), axis=0)
+    return U[:, valid][:, :n].T
+
+
+def sample_panels(n, alpha, theta, seed=seed, use_cache=True):
+    """
+    Draw the samples of both panels.
+
+    Uniforms are cached on disk per (n, seed) and the Gumbel copula sample per
+    (n, theta, seed), so a sweep over alpha only recomputes the Pareto quantiles.
+
+    Returns
+    -------
+    X_indep, X_dep : ndarray of shape (n, 2)
+        Independent Pareto sample and Gumbel copula sample with Pareto margins
+    """
+    n_sample = int(n * 1.5)
+    draws = cached('mo_base_draws', dict(n_sample=n_sample, seed=seed),
+                   lambda: base_draws(n_sample, seed), use_cache)
+    U_indep = cached('indep_uniforms', dict(n=n, seed=seed),
+                     lambda: independent_uniforms(n, seed), use_cache)
+    U_dep = cached('gumbel_copula', dict(n=n, n_sample=n_sample, theta=theta, seed=seed,
+                                         stable='kanter'),
+                   lambda: gumbel_copula_sample(n, theta, draws), use_cache)
+
+    X_indep = pareto_quantile(U_indep, alpha)
+    X_dep = pareto_quantile(U_dep, alpha)
+    return X_indep, X_dep
+
+
+def warm_cache(n=n, seed=seed, **params):
+    """Compute the parameter-free draws once, before a sweep starts its workers."""
+    n_sample = int(n * 1.5)
+    cached('mo_base_draws', dict(n_sample=n_sample, seed=seed),
+           lambda: base_draws(n_sample, seed))
+    cached('indep_uniforms', dict(n=n, seed=seed),
+           lambda: independent_uniforms(n, seed))
+
+
+def render(output_path=OUTPUT_PATH, n=n, alpha=alpha, theta=theta, seed=seed,
+           use_cache=True, mode='auto'):
+    """
+    Draw the figure and save it to `output_path` (PDF) plus a PNG preview.
+
+    `mode` selects plain scatter or density-binned panels (see
+    density_scatter.plot_points); 'auto' bins above 10^5 points.
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure
+    """
+    # Panel 1: Independent Pareto margins
+    # Panel 2: Gumbel copula with Pareto margins (has upper tail dependence)
+    X_indep, X_dep = sample_panels(n, alpha, theta, seed, use_cache)
+    X1_indep, X2_indep = X_indep[:, 0], X_indep[:, 1]
+    X1_dep, X2_dep = X_dep[:, 0], X_dep[:, 1]
+
+    # Plotting
+    fig, axes = plt.subplots(1, 2, figsize=(10, 4.5))
+
+    # Style settings
+    scatter_kwargs = dict(s=12, alpha=0.6, edgecolors='none')
+    xlim, ylim = (0, 20), (0, 20)
+    box_color = 'red'
+    box_alpha = 0.15
+    box_edge = 'red'
+    box_linestyle = '--'
+    box_linewidth = 1.5
+
+    # Threshold for "extreme" region (upper tail)
+    tail_threshold = 10
+
+    # Left panel: Independent
+    ax = axes[0]
+    plot_points(ax, X1_indep, X2_indep, mode=mode, color='steelblue',
+                range=(xlim, ylim), **scatter_kwargs)
+    ax.set_xlabel(r'$X_1$', fontsize=12)
+    ax.set_ylabel(r'$X_2$', fontsize=12)
+    ax.set_title('No tail dependence\n(independent Pareto margins)', fontsize=11)
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+
+    # Add box highlighting upper tail region (should be sparse)
+    rect = Rectangle((tail_threshold, tail_threshold),
+                     xlim[1] - tail_threshold, ylim[1] - tail_threshold,
+                     linewidth=box_linewidth, linestyle=box_linestyle,
+                     edgecolor=box_edge, facecolor=box_color, alpha=box_alpha)
+    ax.add_patch(rect)
+
+    # Count points in tail region
+    n_tail_indep = np.sum((X1_indep > tail_threshold) & (X2_indep > tail_threshold))
+    ax.text(xlim[1] - 1, ylim[1] - 1, f'n={n_tail_indep}', ha='right', va='top',
+            fontsize=9, color='red')
+
+    # Right panel: Gumbel copula (tail dependent)
+    ax = axes[1]
+    plot_points(ax, X1_dep, X2_dep, mode=mode, color='steelblue',
+                range=(xlim, ylim), **scatter_kwargs)
+    ax.set_xlabel(r'$X_1$', fontsize=12)
+    ax.set_ylabel(r'$X_2$', fontsize=12)
+    ax.set_title('Upper tail dependence\n(Gumbel copula, Pareto margins)', fontsize=11)
+    ax.set_xlim(xlim)
+    ax.set_ylim(ylim)
+
+    # Add box highlighting upper tail region (should have clustering)
+    rect = Rectangle((tail_threshold, tail_threshold),
+                     xlim[1] - tail_threshold, ylim[1] - tail_threshold,
+                     linewidth=box_linewidth, linestyle=box_linestyle,
+                     edgecolor=box_edge, facecolor=box_color, alpha=box_alpha)
+    ax.add_patch(rect)
+
+    # Count points in tail region
+    n_tail_dep = np.sum((X1_dep > tail_threshold) & (X2_dep > tail_threshold))
+    ax.text(xlim[1] - 1, ylim[1] - 1, f'n={n_tail_dep}', ha='right', va='top',
+            fontsize=9, color='red')
+
+    plt.tight_layout()
+
+    # Save figure
+    fig.savefig(output_path, bbox_inches='tight', dpi=300)
+    print(f"Figure saved to {output_path}")
+
+    # Also save as PNG for quick preview
+    fig.savefig(output_path.replace('.pdf', '.png'), bbox_inches='tight', dpi=150)
+    print(f"Preview saved to {output_path.replace('.pdf', '.png')}")
+
+    print_chi(X_indep, X_dep, n, alpha, theta, tail_threshold)
+    return fig
+
+
+def print_chi(X_indep, X_dep, n, alpha, theta, tail_threshold):
+    """
+    Print the empirical chi(u) of both panels, from one ranking per panel, at
+    the box level u = F(tail_threshold) and above, next to the Gumbel limit
+    chi = 2 - 2^(1/theta). Levels with fewer than 10 expected exceedances
+    are skipped; nothing is printed if none is left.
+    """
+    levels = [u for u in (1 - tail_threshold ** -alpha, 0.99, 0.999) if n * (1 - u) >= 10]
+    if not levels:
+        return
+    chi_indep = EmpiricalStdf(X_indep).chi(levels)[:, 0]
+    chi_dep = EmpiricalStdf(X_dep).chi(levels)[:, 0]
+    print(f"{'u':>8} {'chi indep':>10} {'chi Gumbel':>11}   (limit {2 - 2 ** (1 / theta):.3f})")
+    for u, c_indep, c_dep in zip(levels, chi_indep, chi_dep):
+        print(f"{u:>8.4f} {c_indep:>10.3f} {c_dep:>11.3f}")
+
+
+if __name__ == '__main__':
+    render()
+    plt.show()
@@ -0,0 +1,388 @@
+"""
+CPU implementation of the HTGAN learning and sampling algorithms (Chapter 3).
+
+Algorithm 1 (learning): margins are mapped to Pareto(1/gamma) with the
+empirical cdf (ecdf.EmpiricalMargins), then a GAN whose latent noise has
+i.i.d. Pareto(1/gamma) margins is trained on the transformed data.
+Algorithm 2 (sampling): Pareto noise is pushed through the generator and
+the margins are mapped back with the inverse empirical cdf.
+
+Generator and discriminator are fully connected LeakyReLU MLPs given by
+their list of hidden dimensions, e.g. [100] and [100, 200, 200, 100], trained
+with Adam as in Section "Implementation".
+
+Throughput:
+- latent noise is drawn in large float32 blocks by a background thread
+  (LatentNoiseBuffer) with the in-place kernels of margins.py;
+- minibatches are slices of a per-epoch permutation of the data tensor;
+- sampling overlaps the generator forward pass of batch i + 1 with the
+  inverse margin transform of batch i.
+
+Usage:
+    python htgan.py --latent-dim 10 --steps 2000
+"""
+
+import argparse
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+from torch import nn
+
+from ecdf import EmpiricalMargins
+from margins import pareto_sample
+
+
+def mlp(in_dim, hidden_dims, out_dim, negative_slope=0.2):
+    """Fully connected network with LeakyReLU activations between layers."""
+    layers = []
+    for dim in hidden_dims:
+        layers += [nn.Linear(in_dim, dim), nn.LeakyReLU(negative_slope)]
+        in_dim = dim
+    layers.append(nn.Linear(in_dim, out_dim))
+    return nn.Sequential(*layers)
+
+
+class LatentNoiseBuffer:
+    """
+    Pareto(alpha) latent noise, pre-generated in blocks by a background thread.
+
+    Parameters
+    ----------
+    latent_dim : int
+        Dimension N of the latent noise
+    alpha : float
+        Pareto tail index of each margin (alpha = 1 / gamma)
+    batch_size : int
+        Rows returned by `next`
+    block_batches : int
+        Batches per pre-generated block
+    n_blocks : int
+        Blocks kept ready in the queue
+    seed : int, optional
+        Seed of the noise generator
+    """
+
+    def __init__(self, latent_dim, alpha, batch_size, block_batches=64, n_blocks=2,
+                 seed=None):
+        self.latent_dim = latent_dim
+        self.alpha = alpha
+        self.batch_size = batch_size
+        self.block_batches = block_batches
+        self._rng = np.random.default_rng(seed)
+        self._queue = queue.Queue(maxsize=n_blocks)
+        self._stop = threading.Event()
+        self._block = None
+        self._position = block_batches
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        shape = (self.block_batches, self.batch_size, self.latent_dim)
+        while not self._stop.is_set():
+            block = pareto_sample(shape, self.alpha, self._rng, dtype=np.float32)
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(block, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def next(self):
+        """Return the next (batch_size, latent_dim) noise batch as a tensor."""
+        if self._position == self.block_batches:
+            self._block = torch.from_numpy(self._queue.get())
+            self._position = 0
+        batch = self._block[self._position]
+        self._position += 1
+        return batch
+
+    def close(self):
+        """Stop the background thread."""
+        self._stop.set()
+        self._thread.join()
+
+
+class HTGAN:
+    """
+    GAN with heavy-tailed (Pareto) latent noise.
+
+    Parameters
+    ----------
+    data_dim : int
+        Dimension d of the data
+    latent_dim : int
+        Dimension N of the latent noise
+    gamma : float
+        Tail parameter of the renormalization step (latent margins are
+        Pareto(1/gamma), as the transformed data)
+    generator_dims, discriminator_dims : list of int
+        Hidden dimensions of both MLPs
+    lr : float
+        Adam learning rate of both networks
+    batch_size : int
+        Minibatch size
+    d_steps, g_steps : int
+        Discriminator and generator updates per training step
+    num_threads : int, optional
+        Torch intra-op threads (torch default if None)
+    seed : int, optional
+        Seed of weights, minibatches and noise
+    """
+
+    def __init__(self, data_dim, latent_dim, gamma, generator_dims=(100,),
+                 discriminator_dims=(100, 200, 200, 100), lr=1e-4, batch_size=512,
+                 d_steps=1, g_steps=1, num_threads=None, seed=None):
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
+        if seed is not None:
+            torch.manual_seed(seed)
+        self.data_dim = data_dim
+        self.latent_dim = latent_dim
+        self.gamma = gamma
+        self.batch_size = batch_size
+        self.d_steps = d_steps
+        self.g_steps = g_steps
+        self.seed = seed
+
+        self.generator = mlp(latent_dim, generator_dims, data_dim)
+        self.discriminator = mlp(data_dim, discriminator_dims, 1)
+        self.opt_g = torch.optim.Adam(self.generator.parameters(), lr=lr)
+        self.opt_d = torch.optim.Adam(self.discriminator.parameters(), lr=lr)
+        self.loss = nn.BCEWithLogitsLoss()
+        self.ones = torch.ones(batch_size, 1)
+        self.zeros = torch.zeros(batch_size, 1)
+
+        self.step = 0
+        self._noise = None
+        self._data = None
+        self._batches = iter(())
+
+    def _noise_buffer(self):
+        if self._noise is None:
+            self._noise = LatentNoiseBuffer(self.latent_dim, 1 / self.gamma,
+                                            self.batch_size, seed=self.seed)
+        return self._noise
+
+    def _next_batch(self):
+        """Next data minibatch: slices of a fresh permutation at every epoch."""
+        try:
+            return next(self._batches)
+        except StopIteration:
+            perm = torch.randperm(self._data.shape[0])
+            n_full = (perm.numel() // self.batch_size) * self.batch_size
+            self._batches = iter(self._data[perm[:n_full]].split(self.batch_size))
+            return next(self._batches)
+
+    def fit(self, X_tilde, n_steps, log_every=500, callback=None):
+        """
+        Train on data with Pareto(1/gamma) margins (step 3 of Algorithm 1).
+
+        Calling `fit` again resumes training from the current state.
+
+        Parameters
+        ----------
+        X_tilde : ndarray of shape (n, d)
+            Transformed training data (n >= batch_size)
+        n_steps : int
+            Number of training steps (each of d_steps + g_steps updates)
+        log_every : int
+            Steps between two calls of `callback`
+        callback : callable, optional
+            callback(model, stats) with stats the dict of losses and
+            throughputs since the last call; returning True stops training
+
+        Returns
+        -------
+        stats : dict
+            Last reported statistics
+        """
+        self._data = torch.as_tensor(np.asarray(X_tilde, dtype=np.float32))
+        self._batches = iter(())
+        noise = self._noise_buffer()
+        self.generator.train()
+        self.discriminator.train()
+
+        stats = {}
+        tic, last_step = time.perf_counter(), self.step
+        for _ in range(n_steps):
+            for _ in range(self.d_steps):
+                real = self._next_batch()
+                with torch.no_grad():
+                    fake = self.generator(noise.next())
+                loss_d = (self.loss(self.discriminator(real), self.ones)
+                          + self.loss(self.discriminator(fake), self.zeros))
+                self.opt_d.zero_grad(set_to_none=True)
+                loss_d.backward()
+                self.opt_d.step()
+
+            for _ in range(self.g_steps):
+                fake = self.generator(noise.next())
+                loss_g = self.loss(self.discriminator(fake), self.ones)
+                self.opt_g.zero_grad(set_to_none=True)
+                loss_g.backward()
+                self.opt_g.step()
+
+            self.step += 1
+            if self.step % log_every == 0:
+                elapsed = time.perf_counter() - tic
+                steps = self.step - last_step
+                stats = dict(
+                    step=self.step,
+                    loss_d=loss_d.item(),
+                    loss_g=loss_g.item(),
+                    steps_per_s=steps / elapsed,
+                    # Rows through the discriminator: real + fake per D update
+                    samples_per_s=steps * self.batch_size
+                    * (2 * self.d_steps + self.g_steps) / elapsed,
+                )
+                if callback is not None and callback(self, stats):
+                    break
+                tic, last_step = time.perf_counter(), self.step
+        return stats
+
+    def sample_tilde(self, n, batch_size=65536, seed=None):
+        """
+        Yield generated batches on the Pareto scale (steps 1-2 of Algorithm 2).
+
+        Parameters
+        ----------
+        n : int
+            Total number of points
+        batch_size : int
+            Rows per yielded batch
+        seed : int, optional
+            Seed of the sampling noise
+
+        Yields
+        ------
+        X_tilde : ndarray of shape (rows, d), float32
+        """
+        rng = np.random.default_rng(seed)
+        noise = np.empty((batch_size, self.latent_dim), dtype=np.float32)
+        self.generator.eval()
+        try:
+            for start in range(0, n, batch_size):
+                rows = min(batch_size, n - start)
+                pareto_sample(None, 1 / self.gamma, rng, out=noise[:rows])
+                # Only the forward pass: inference mode must not stay on in
+                # the caller while the generator is suspended at yield
+                with torch.inference_mode():
+                    batch = self.generator(torch.from_numpy(noise[:rows])).numpy()
+                yield batch
+        finally:
+            self.generator.train()
+
+    def sample(self, n, margins, batch_size=65536, seed=None):
+        """
+        Yield generated batches on the original scale (Algorithm 2).
+
+        The inverse margin transform of a batch runs in a worker thread while
+        the generator processes the next one. It writes float64 batches: the
+        extrapolated tails of the margins do not fit the float32 generator
+        output.
+
+        Parameters
+        ----------
+        n : int
+            Total number of points
+        margins : ecdf.EmpiricalMargins
+            Margins fitted on the training data
+        batch_size : int
+            Rows per yielded batch
+        seed : int, optional
+            Seed of the sampling noise
+
+        Yields
+        ------
+        X_hat : ndarray of shape (rows, d), float64
+        """
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = None
+            for X_tilde in self.sample_tilde(n, batch_size, seed):
+                out = np.empty(X_tilde.shape, dtype=np.float64)
+                future = pool.submit(margins.inverse_transform, X_tilde, self.gamma, out)
+                if pending is not None:
+                    yield pending.result()
+                pending = future
+            if pending is not None:
+                yield pending.result()
+
+    def close(self):
+        """Stop the latent noise thread."""
+        if self._noise is not None:
+            self._noise.close()
+            self._noise = None
+
+
+def train_htgan(X, gamma, latent_dim, n_steps, margins=None, log_every=500,
+                callback=None, **kwargs):
+    """
+    Algorithm 1: estimate the margins, renormalize and train an HTGAN.
+
+    Parameters
+    ----------
+    X : ndarray of shape (n, d)
+        Training data
+    gamma : float
+        Tail parameter of the renormalization step
+    latent_dim : int
+        Dimension N of the latent noise
+    n_steps : int
+        Number of training steps
+    margins : ecdf.EmpiricalMargins, optional
+        Unfitted margin estimator (EmpiricalMargins() if None)
+    **kwargs
+        Passed to HTGAN
+
+    Returns
+    -------
+    model : HTGAN
+    margins : ecdf.EmpiricalMargins
+        Fitted margins, to be passed to `model.sample`
+    """
+    margins = (margins or EmpiricalMargins()).fit(X)
+    X_tilde = margins.transform(X, gamma)
+    model = HTGAN(X.shape[1], latent_dim, gamma, **kwargs)
+    model.fit(X_tilde, n_steps, log_every, callback)
+    return model, margins
+
+
+if __name__ == '__main__':
+    from fig_tail_dependence import base_draws, gumbel_copula_sample
+    from margins import pareto_quantile
+
+    parser = argparse.ArgumentParser(description='Train an HTGAN on Gumbel copula data '
+                                                 'with Pareto margins and report throughput.')
+    parser.add_argument('--n', type=int, default=10_000)
+    parser.add_argument('--alpha', type=float, default=2.0, help='tail index of the data')
+    parser.add_argument('--theta', type=float, default=4 / 3, help='Gumbel parameter')
+    parser.add_argument('--latent-dim', type=int, default=10)
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=512)
+    parser.add_argument('--d-steps', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--n-generate', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    U = gumbel_copula_sample(args.n, args.theta, base_draws(int(args.n * 1.5), seed=0))
+    X = pareto_quantile(U, args.alpha)
+
+    def report(model, stats):
+        print(f"step {stats['step']:>6} | loss D {stats['loss_d']:.3f} | "
+              f"loss G {stats['loss_g']:.3f} | {stats['steps_per_s']:.1f} steps/s | "
+              f"{stats['samples_per_s']:.0f} samples/s")
+
+    model, margins = train_htgan(X, 1 / args.alpha, args.latent_dim, args.steps,
+                                 batch_size=args.batch_size, d_steps=args.d_steps,
+                                 num_threads=args.threads, seed=0, callback=report)
+    model.close()
+
+    tic = time.perf_counter()
+    n_generated = sum(len(batch) for batch in model.sample(args.n_generate, margins))
+    elapsed = time.perf_counter() - tic
+    print(f"\nGenerated {n_generated} points in {elapsed:.2f}s "
+          f"({n_generated / elapsed:.0f} samples/s)")
@@ -0,0 +1,296 @@
+"""
+Hyperparameter sweep of HTGAN on Gumbel copula data with SWD_90 pruning.
+
+Each experiment (alpha, dim_data, theta) is a Gumbel copula with Pareto(alpha)
+margins; each trial trains one HTGAN configuration (latent_dim, architectures,
+learning rate, seed) on it. Trials run in a process pool and are evaluated
+with SWD_90 at the budgets min_steps * eta^k, ..., max_steps (rungs).
+
+Pruning follows ASHA (asynchronous successive halving): at each rung, a trial
+continues only if its SWD_90 is within the best 1/eta fraction of the scores
+recorded so far at that rung for the same experiment. Completed trials enter
+a bounded heap holding the top 5% runs of their experiment, from which the
+table_latent_dim.tex summary (mean, min, max over the top runs, averaged over
+theta) is written.
+
+Usage:
+    python htgan_sweep.py --alpha 1.5 2.0 2.5 --dim-data 2 5 10 --theta 1.33 2 4 \\
+        --latent-dim 2 5 10 20 50 80 --seeds 0 1 2 --workers 20
+
+Output: figures/htgan/table_latent_dim.tex
+"""
+
+import argparse
+import heapq
+import itertools
+import math
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from ecdf import EmpiricalMargins, hill_estimator
+from fig_tail_dependence import base_draws, gumbel_copula_sample
+from margins import pareto_quantile
+from metrics import stdf_error, swd_extreme
+from sample_cache import cached
+
+OUTPUT_PATH = '../figures/htgan/table_latent_dim.tex'
+
+N_TRAIN = 10_000
+N_TEST = 20_000
+
+
+class TopK:
+    """Bounded heap keeping the k items with the smallest scores."""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+        self._counter = itertools.count()
+
+    def push(self, score, item):
+        entry = (-score, next(self._counter), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif -score > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """Items sorted by increasing score."""
+        return [item for _, _, item in sorted(self._heap, key=lambda e: (-e[0], e[1]))]
+
+
+def experiment_data(alpha, dim_data, theta, seed=0):
+    """
+    Train and test samples of a Gumbel copula with Pareto(alpha) margins.
+
+    Cached on disk, so all trials of an experiment share the same data.
+
+    Returns
+    -------
+    X_train : ndarray of shape (N_TRAIN, dim_data)
+    X_test : ndarray of shape (N_TEST, dim_data)
+    """
+    n = N_TRAIN + N_TEST
+
+    def compute():
+        draws = base_draws(n, seed, dim=dim_data)
+        return pareto_quantile(gumbel_copula_sample(n, theta, draws), alpha)
+
+    X = cached('htgan_experiment',
+               dict(alpha=alpha, dim_data=dim_data, theta=theta, n=n, seed=seed,
+                    stable='kanter'), compute)
+    return X[:N_TRAIN], X[N_TRAIN:]
+
+
+def rung_budgets(min_steps, max_steps, eta):
+    """Training steps at which trials are evaluated: min_steps * eta^k, ..., max_steps."""
+    budgets = []
+    budget = min_steps
+    while budget < max_steps:
+        budgets.append(budget)
+        budget *= eta
+    return budgets + [max_steps]
+
+
+def keep_training(rungs, lock, key, score, eta):
+    """
+    ASHA rule: record `score` at rung `key` and keep the trial if it is within
+    the best 1/eta fraction of the scores recorded there (lower is better).
+    """
+    with lock:
+        scores = rungs.get(key, []) + [score]
+        rungs[key] = scores
+    if len(scores) < eta:
+        return True
+    return score <= np.quantile(scores, 1 / eta)
+
+
+def tail_index_estimate(X, fraction=0.05):
+    """Tail index alpha of the norms of X, with the Hill estimator."""
+    norms = np.sort(np.linalg.norm(X, axis=1))
+    k = max(2, int(fraction * len(norms)))
+    return 1 / hill_estimator(norms[None, -k - 1:])[0]
+
+
+def run_trial(config, budgets, rungs, lock, eta, xi=0.9):
+    """
+    Worker: train one configuration, evaluate SWD_xi at every rung and stop
+    as soon as ASHA prunes it.
+
+    Returns
+    -------
+    result : dict
+        The configuration plus steps, w_90 (last SWD), alpha_estimate,
+        stdf_error (see metrics.stdf_error), completed (reached max budget)
+        and history [(steps, SWD), ...]
+    """
+    import torch
+    from htgan import HTGAN
+
+    torch.set_num_threads(1)
+    experiment = (config['alpha'], config['dim_data'], config['theta'])
+    X_train, X_test = experiment_data(*experiment)
+    gamma = 1 / config['alpha']
+    margins = EmpiricalMargins().fit(X_train)
+    X_tilde = margins.transform(X_train, gamma)
+
+    model = HTGAN(config['dim_data'], config['latent_dim'], gamma,
+                  generator_dims=config['generator_dims'],
+                  discriminator_dims=config['discriminator_dims'],
+                  lr=config['lr'], batch_size=config['batch_size'],
+                  seed=config['seed'], num_threads=1)
+
+    history = []
+    completed = False
+    for rung, budget in enumerate(budgets):
+        model.fit(X_tilde, budget - model.step, log_every=budget + 1)
+        X_gen = np.concatenate(list(model.sample(len(X_test), margins, seed=rung)))
+        score = swd_extreme(X_gen, X_test, xi)
+        history.append((budget, score))
+        if rung == len(budgets) - 1:
+            completed = True
+        elif not keep_training(rungs, lock, (experiment, rung), score, eta):
+            break
+    model.close()
+
+    return dict(config, steps=model.step, w_90=score, completed=completed,
+                alpha_estimate=tail_index_estimate(X_gen),
+                stdf_error=stdf_error(X_gen, X_test), history=history)
+
+
+def run_sweep(configs, min_steps, max_steps, eta=3, top_fraction=0.05, workers=None):
+    """
+    Run every configuration with ASHA pruning and keep the top runs.
+
+    Parameters
+    ----------
+    configs : list of dict
+        Trial configurations (see `expand_configs`)
+    min_steps, max_steps : int
+        First and last rung budgets
+    eta : int
+        Reduction factor of successive halving
+    top_fraction : float
+        Fraction of the trials of each experiment kept in the top heap
+    workers : int, optional
+        Number of processes
+
+    Returns
+    -------
+    top_runs : dict
+        (alpha, dim_data, theta) -> list of results sorted by SWD_90
+    total_steps : int
+        Training steps actually spent
+    """
+    budgets = rung_budgets(min_steps, max_steps, eta)
+    n_trials = defaultdict(int)
+    for config in configs:
+        n_trials[(config['alpha'], config['dim_data'], config['theta'])] += 1
+    tops = {experiment: TopK(max(1, math.ceil(top_fraction * count)))
+            for experiment, count in n_trials.items()}
+
+    # Generate each experiment's data once, before the workers read it
+    for experiment in tops:
+        experiment_data(*experiment)
+
+    total_steps = 0
+    with multiprocessing.Manager() as manager:
+        rungs, lock = manager.dict(), manager.Lock()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_trial, config, budgets, rungs, lock, eta)
+                       for config in configs]
+            for future in as_completed(futures):
+                result = future.result()
+                total_steps += result['steps']
+                status = 'done' if result['completed'] else 'pruned'
+                print(f"alpha={result['alpha']} d={result['dim_data']} "
+                      f"theta={result['theta']} N={result['latent_dim']} "
+                      f"seed={result['seed']}: {status} at {result['steps']} steps, "
+                      f"SWD_90={result['w_90']:.4f}")
+                if result['completed']:
+                    experiment = (result['alpha'], result['dim_data'], result['theta'])
+                    tops[experiment].push(result['w_90'], result)
+
+    return {experiment: top.items() for experiment, top in tops.items()}, total_steps
+
+
+def expand_configs(alpha, dim_data, theta, latent_dim, seeds, generator_dims=((100,),),
+                   discriminator_dims=((100, 200, 200, 100),), lr=(1e-4,),
+                   batch_size=(512,)):
+    """Cartesian product of the hyperparameter lists, as a list of dicts."""
+    keys = ['alpha', 'dim_data', 'theta', 'latent_dim', 'seed', 'generator_dims',
+            'discriminator_dims', 'lr', 'batch_size']
+    grid = itertools.product(alpha, dim_data, theta, latent_dim, seeds, generator_dims,
+                             discriminator_dims, lr, batch_size)
+    return [dict(zip(keys, values)) for values in grid]
+
+
+def latex_table(top_runs):
+    """
+    Summary of the top runs in the layout of table_latent_dim.tex.
+
+    Rows are (alpha, dim_data), statistics pool the top runs over theta.
+    """
+    columns = [('latent_dim', '{:.2f}', '{:.0f}'), ('alpha_estimate', '{:.2f}', '{:.2f}'),
+               ('w_90', '{:.2f}', '{:.2f}')]
+    pooled = defaultdict(list)
+    for (alpha, dim_data, _), runs in sorted(top_runs.items()):
+        pooled[(alpha, dim_data)] += runs
+    alphas = sorted({alpha for alpha, _ in pooled})
+
+    lines = [
+        r'\begin{tabular}{ll' + 'rrr' * len(columns) + '}',
+        r'\toprule',
+        ' &  & ' + ' & '.join(rf'\multicolumn{{3}}{{r}}{{{name}}}'.replace('_', r'\_')
+                              for name, _, _ in columns) + r' \\',
+        ' &  & ' + ' & '.join(['mean & min & max'] * len(columns)) + r' \\',
+        'alpha & dim\\_data' + ' & ' * (3 * len(columns)) + r' \\',
+        r'\midrule',
+    ]
+    for alpha in alphas:
+        dims = sorted(d for a, d in pooled if a == alpha)
+        for i, dim_data in enumerate(dims):
+            runs = pooled[(alpha, dim_data)]
+            cells = [rf'\multirow[t]{{{len(dims)}}}{{*}}{{{alpha:f}}}' if i == 0 else '',
+                     str(dim_data)]
+            for name, mean_fmt, extreme_fmt in columns:
+                values = np.array([run[name] for run in runs], dtype=float)
+                cells += [mean_fmt.format(values.mean()), extreme_fmt.format(values.min()),
+                          extreme_fmt.format(values.max())]
+            lines.append(' & '.join(cells) + r' \\')
+        lines.append(rf'\cline{{1-{2 + 3 * len(columns)}}}')
+    lines += [r'\bottomrule', r'\end{tabular}']
+    return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='HTGAN sweep with SWD_90-based ASHA pruning.')
+    parser.add_argument('--alpha', type=float, nargs='+', default=[1.5, 2.0, 2.5])
+    parser.add_argument('--dim-data', type=int, nargs='+', default=[2, 5])
+    parser.add_argument('--theta', type=float, nargs='+', default=[4 / 3, 2.0, 4.0])
+    parser.add_argument('--latent-dim', type=int, nargs='+', default=[2, 5, 10, 20, 50, 80])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0])
+    parser.add_argument('--lr', type=float, nargs='+', default=[1e-4, 1e-5])
+    parser.add_argument('--min-steps', type=int, default=500)
+    parser.add_argument('--max-steps', type=int, default=13_500)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--top-fraction', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    args = parser.parse_args()
+
+    configs = expand_configs(args.alpha, args.dim_data, args.theta, args.latent_dim,
+                             args.seeds, lr=args.lr)
+    top_runs, total_steps = run_sweep(configs, args.min_steps, args.max_steps, args.eta,
+                                      args.top_fraction, args.workers)
+
+    full_steps = len(configs) * args.max_steps
+    print(f"\n{len(configs)} trials, {total_steps} training steps "
+          f"({full_steps / total_steps:.1f}x fewer than the full grid)")
+
+    with open(args.output, 'w') as f:
+        f.write(latex_table(top_runs))
+    print(f"Table saved to {args.output}")
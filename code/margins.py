@@ -0,0 +1,201 @@
+"""
+In-place marginal transform kernels for Pareto, Frechet and GPD margins.
+
+Closed-form CDF, quantile and log-quantile of
+- Pareto(alpha), support [1, inf):      F(x) = 1 - x^(-alpha)
+- Frechet(alpha), support (0, inf):     F(x) = exp(-x^(-alpha))
+- GPD(xi, sigma), support [0, inf):     F(x) = 1 - (1 + xi x / sigma)^(-1/xi)
+
+Unlike scipy.stats, each kernel is a short chain of numpy ufuncs writing into
+a single output buffer (`out=`, which may be the input itself), processed in
+chunks of `chunk_size` elements. No temporary of the size of the input is
+allocated, so 10^8 copula uniforms can be pushed to their margins in place.
+float32 inputs stay float32; other inputs are computed in float64.
+
+Example:
+    U = rng.random(10**8, dtype=np.float32)
+    pareto_quantile(U, alpha=1.5, out=U)  # U now holds Pareto samples
+"""
+
+import numpy as np
+
+CHUNK_SIZE = 2**20
+
+
+def _apply(kernel, x, out, chunk_size):
+    """
+    Run `kernel(x_chunk, out_chunk)` over contiguous chunks of `x`.
+
+    Parameters
+    ----------
+    kernel : callable
+        Writes its result into the output chunk using ufuncs with out=
+    x : array_like
+        Input values
+    out : ndarray, optional
+        C-contiguous output buffer of the same shape as x (may be x itself)
+    chunk_size : int
+        Number of elements processed per chunk
+
+    Returns
+    -------
+    out : ndarray
+    """
+    x = np.asarray(x)
+    dtype = np.float32 if x.dtype == np.float32 else np.float64
+    if out is None:
+        out = np.empty(x.shape, dtype=dtype)
+    elif out.shape != x.shape:
+        raise ValueError(f"out has shape {out.shape}, expected {x.shape}")
+    elif not out.flags.c_contiguous:
+        raise ValueError("out must be C-contiguous")
+    x = np.ascontiguousarray(x)
+
+    flat_x = x.reshape(-1)
+    flat_out = out.reshape(-1)
+    for start in range(0, flat_x.size, chunk_size):
+        stop = start + chunk_size
+        kernel(flat_x[start:stop], flat_out[start:stop])
+    return out
+
+
+def _sample(quantile, size, rng, dtype, out, **params):
+    """Inverse-transform sampling: fill `out` with uniforms, then map in place."""
+    rng = np.random.default_rng(rng)
+    if out is None:
+        out = np.empty(size, dtype=dtype)
+    rng.random(out=out, dtype=out.dtype)
+    return quantile(out, out=out, **params)
+
+
+# Pareto(alpha), scale 1 (as scipy.stats.pareto)
+
+def pareto_cdf(x, alpha, out=None, chunk_size=CHUNK_SIZE):
+    """F(x) = 1 - x^(-alpha) for x >= 1, 0 below."""
+    def kernel(x, o):
+        np.maximum(x, 1, out=o)
+        np.power(o, -alpha, out=o)
+        np.subtract(1, o, out=o)
+    return _apply(kernel, x, out, chunk_size)
+
+
+def pareto_quantile(u, alpha, out=None, chunk_size=CHUNK_SIZE):
+    """F^{-1}(u) = (1 - u)^(-1/alpha)."""
+    def kernel(u, o):
+        np.negative(u, out=o)
+        np.log1p(o, out=o)
+        np.multiply(o, -1 / alpha, out=o)
+        np.exp(o, out=o)
+    return _apply(kernel, u, out, chunk_size)
+
+
+def pareto_log_quantile(u, alpha, out=None, chunk_size=CHUNK_SIZE):
+    """log F^{-1}(u) = -log(1 - u) / alpha, exact for u close to 1."""
+    def kernel(u, o):
+        np.negative(u, out=o)
+        np.log1p(o, out=o)
+        np.multiply(o, -1 / alpha, out=o)
+    return _apply(kernel, u, out, chunk_size)
+
+
+def pareto_sample(size, alpha, rng=None, dtype=np.float64, out=None):
+    """Draw Pareto(alpha) samples by inverse transform, without temporaries."""
+    return _sample(pareto_quantile, size, rng, dtype, out, alpha=alpha)
+
+
+# Frechet(alpha), scale 1
+
+def frechet_cdf(x, alpha, out=None, chunk_size=CHUNK_SIZE):
+    """F(x) = exp(-x^(-alpha)) for x > 0, 0 for x <= 0."""
+    def kernel(x, o):
+        np.maximum(x, 0, out=o)
+        with np.errstate(divide='ignore'):
+            np.power(o, -alpha, out=o)
+        np.negative(o, out=o)
+        np.exp(o, out=o)
+    return _apply(kernel, x, out, chunk_size)
+
+
+def frechet_quantile(u, alpha, out=None, chunk_size=CHUNK_SIZE):
+    """F^{-1}(u) = (-log u)^(-1/alpha)."""
+    def kernel(u, o):
+        np.log(u, out=o)
+        np.negative(o, out=o)
+        np.power(o, -1 / alpha, out=o)
+    return _apply(kernel, u, out, chunk_size)
+
+
+def frechet_log_quantile(u, alpha, out=None, chunk_size=CHUNK_SIZE):
+    """log F^{-1}(u) = -log(-log u) / alpha."""
+    def kernel(u, o):
+        np.log(u, out=o)
+        np.negative(o, out=o)
+        np.log(o, out=o)
+        np.multiply(o, -1 / alpha, out=o)
+    return _apply(kernel, u, out, chunk_size)
+
+
+def frechet_sample(size, alpha, rng=None, dtype=np.float64, out=None):
+    """Draw Frechet(alpha) samples by inverse transform, without temporaries."""
+    return _sample(frechet_quantile, size, rng, dtype, out, alpha=alpha)
+
+
+# Generalized Pareto GPD(xi, sigma), location 0
+
+def gpd_cdf(x, xi, sigma=1.0, out=None, chunk_size=CHUNK_SIZE):
+    """
+    F(x) = 1 - (1 + xi x / sigma)^(-1/xi), or 1 - exp(-x / sigma) if xi = 0.
+
+    0 below the support and, for xi < 0, 1 beyond the endpoint -sigma / xi.
+    """
+    def kernel(x, o):
+        if xi == 0:
+            np.multiply(x, -1 / sigma, out=o)
+            np.expm1(o, out=o)
+            np.negative(o, out=o)
+        else:
+            np.multiply(x, xi / sigma, out=o)
+            # 1 + xi x / sigma <= 0 outside the support: log1p(-1) = -inf
+            # gives F = 1 beyond the xi < 0 endpoint, F = 0 below 0 if xi > 0
+            np.maximum(o, -1, out=o)
+            with np.errstate(divide='ignore'):
+                np.log1p(o, out=o)
+            np.multiply(o, -1 / xi, out=o)
+            np.expm1(o, out=o)
+            np.negative(o, out=o)
+        np.clip(o, 0, 1, out=o)
+    return _apply(kernel, x, out, chunk_size)
+
+
+def gpd_quantile(u, xi, sigma=1.0, out=None, chunk_size=CHUNK_SIZE):
+    """F^{-1}(u) = sigma / xi ((1 - u)^(-xi) - 1), or -sigma log(1 - u) if xi = 0."""
+    def kernel(u, o):
+        np.negative(u, out=o)
+        np.log1p(o, out=o)
+        if xi == 0:
+            np.multiply(o, -sigma, out=o)
+        else:
+            np.multiply(o, -xi, out=o)
+            np.expm1(o, out=o)
+            np.multiply(o, sigma / xi, out=o)
+    return _apply(kernel, u, out, chunk_size)
+
+
+def gpd_log_quantile(u, xi, sigma=1.0, out=None, chunk_size=CHUNK_SIZE):
+    """log F^{-1}(u)."""
+    def kernel(u, o):
+        np.negative(u, out=o)
+        np.log1p(o, out=o)
+        if xi == 0:
+            np.multiply(o, -sigma, out=o)
+        else:
+            np.multiply(o, -xi, out=o)
+            np.expm1(o, out=o)
+            np.multiply(o, sigma / xi, out=o)
+        np.log(o, out=o)
+    return _apply(kernel, u, out, chunk_size)
+
+
+def gpd_sample(size, xi, sigma=1.0, rng=None, dtype=np.float64, out=None):
+    """Draw GPD(xi, sigma) samples by inverse transform, without temporaries."""
+    return _sample(gpd_quantile, size, rng, dtype, out, xi=xi, sigma=sigma)
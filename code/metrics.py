@@ -0,0 +1,115 @@
+"""
+Extreme-region metrics of Chapter 3 (HTGAN experiments).
+
+SWD_xi: keep the points whose Euclidean norm exceeds the upper xi-quantile
+of the norms, project them on the unit sphere, and compute the sliced
+Wasserstein distance (eq. swd) between the generated and the test sample:
+
+    SWD_p(mu, nu) = E_v[ W_p^p(v#mu, v#nu) ]^(1/p),  v ~ U(S^{d-1})
+
+stdf error: sup-distance between the rank-based empirical stdfs of the
+generated and the test sample over directions of the simplex (the stdf is
+homogeneous), see stdf.py.
+"""
+
+import numpy as np
+
+from stdf import EmpiricalStdf
+
+
+def extreme_directions(X, xi=0.9):
+    """
+    Directions X / |X| of the points above the xi-quantile of the norms.
+
+    The threshold is found with np.partition (no full sort).
+
+    Parameters
+    ----------
+    X : ndarray of shape (n, d)
+    xi : float
+        Quantile level in (0, 1)
+
+    Returns
+    -------
+    directions : ndarray of shape (m, d)
+        Unit vectors, m ~ (1 - xi) n
+    """
+    norms = np.linalg.norm(X, axis=1)
+    k = min(int(xi * len(norms)), len(norms) - 1)
+    threshold = np.partition(norms, k)[k]
+    keep = norms > threshold
+    return X[keep] / norms[keep, None]
+
+
+def sliced_wasserstein(X, Y, n_projections=200, p=2, seed=None):
+    """
+    Monte Carlo sliced Wasserstein distance between two point clouds.
+
+    Samples of different sizes are compared through their empirical quantile
+    functions on a common grid of levels.
+
+    Parameters
+    ----------
+    X : ndarray of shape (n, d)
+    Y : ndarray of shape (m, d)
+    n_projections : int
+        Number of random directions v
+    p : float
+        Order of the Wasserstein distance
+    seed : int, optional
+        Seed of the random directions
+
+    Returns
+    -------
+    swd : float
+    """
+    rng = np.random.default_rng(seed)
+    V = rng.standard_normal((X.shape[1], n_projections))
+    V /= np.linalg.norm(V, axis=0)
+
+    proj_x = np.sort(X @ V, axis=0)
+    proj_y = np.sort(Y @ V, axis=0)
+    if len(proj_x) != len(proj_y):
+        levels = (np.arange(max(len(proj_x), len(proj_y))) + 0.5) / max(len(proj_x), len(proj_y))
+        proj_x = np.quantile(proj_x, levels, axis=0)
+        proj_y = np.quantile(proj_y, levels, axis=0)
+
+    w_pp = np.mean(np.abs(proj_x - proj_y) ** p, axis=0)
+    return float(np.mean(w_pp) ** (1 / p))
+
+
+def swd_extreme(X_gen, X_test, xi=0.9, n_projections=200, p=2, seed=0):
+    """SWD_xi between the extreme directions of generated and test data."""
+    return sliced_wasserstein(extreme_directions(X_gen, xi),
+                              extreme_directions(X_test, xi),
+                              n_projections, p, seed)
+
+
+def simplex_directions(dim, n_directions=1000, seed=0):
+    """Query points on the unit simplex: a uniform grid for dim = 2, Dirichlet(1) draws above."""
+    if dim == 2:
+        w = np.linspace(0, 1, n_directions)
+        return np.column_stack([w, 1 - w])
+    return np.random.default_rng(seed).dirichlet(np.ones(dim), n_directions)
+
+
+def stdf_error(X_gen, X_test, k_fraction=0.05, n_directions=1000, seed=0):
+    """
+    Sup-distance between the empirical stdfs of two samples on the simplex.
+
+    Parameters
+    ----------
+    X_gen, X_test : ndarray of shape (n, d), (m, d)
+    k_fraction : float
+        Number of extreme points k as a fraction of each sample size
+    n_directions : int
+        Number of query points on the simplex
+
+    Returns
+    -------
+    error : float
+    """
+    W = simplex_directions(X_test.shape[1], n_directions, seed)
+    ell_gen = EmpiricalStdf(X_gen)(W, max(1, int(k_fraction * len(X_gen))))
+    ell_test = EmpiricalStdf(X_test)(W, max(1, int(k_fraction * len(X_test))))
+    return float(np.max(np.abs(ell_gen - ell_test)))
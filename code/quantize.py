@@ -0,0 +1,265 @@
+"""
+Quantization of D-norm generators into k uniformly weighted atoms (Chapter 3).
+
+A generator G >= 0 with E[G] = 1 is written G = R W, with R = |G|_1 and W on
+the unit simplex. Since max_j x_j G_j is 1-homogeneous in G,
+    l(x) = E[R] E_R[ max_j x_j W_j ],
+where E_R is the expectation under the R-weighted law of W. The directions W
+are quantized by mini-batch k-means weighted by R (centroids are convex
+combinations of points of the simplex, so they stay on it); a final full
+Lloyd step makes each centroid w_i the R-weighted mean of its cell, with
+mass p_i. As in the weighted-to-uniform lemma of the appendix, the atoms
+    gamma_i = k p_i E[R] w_i,  i = 1..k,
+with uniform weights 1/k then generate the D-norm of the weighted quantizer
+and satisfy (1/k) sum_i gamma_i = E[G] = 1 exactly.
+
+The atoms give the stdf in O(k) per query (stdf.stdf_from_generator) and
+max-linear scenarios Z_j = max_i gamma_ij F_i / k with F_i iid unit Frechet,
+whose stdf is the quantized one. `quantization_errors` reports
+sup_x |l_k(x) - l(x)| / |x|_inf over the simplex for increasing k, each fit
+warm-started from the previous atoms.
+
+Usage:
+    python quantize.py --theta 2.0 --dim 3 --n 1000000 --k 2 4 8 16 32 64 128
+"""
+
+import argparse
+import time
+
+import numpy as np
+from scipy.special import gamma as gamma_function
+
+from margins import frechet_sample
+from metrics import simplex_directions
+from stdf import gumbel_stdf, stdf_from_generator
+
+CHUNK_SIZE = 2**16
+
+
+def gumbel_generator_sample(n, theta, dim=2, seed=None):
+    """Generator G = F / Gamma(1 - 1/theta), F iid Frechet(theta), of the Gumbel stdf."""
+    return frechet_sample((n, dim), theta, seed) / gamma_function(1 - 1 / theta)
+
+
+def _nearest(W, centroids):
+    """Index of the nearest centroid of each row of W (squared Euclidean distance)."""
+    scores = W @ centroids.T
+    scores *= -2
+    scores += np.einsum('ij,ij->i', centroids, centroids)
+    return np.argmin(scores, axis=1)
+
+
+def _kmeans_plus_plus(W, weights, k, rng, centroids=None):
+    """
+    Weighted k-means++ seeding, extending the given centroids up to k.
+
+    Parameters
+    ----------
+    W : ndarray of shape (m, d)
+        Points (a subsample of the directions)
+    weights : ndarray of shape (m,)
+    k : int
+        Number of centroids
+    centroids : ndarray of shape (k0, d), optional
+        Existing centroids to keep (warm start), k0 <= k
+    """
+    if centroids is None or len(centroids) == 0:
+        first = rng.choice(len(W), p=weights / weights.sum())
+        centroids = W[first:first + 1]
+    centroids = list(centroids)
+    dist = np.min(((W[:, None, :] - np.array(centroids)[None]) ** 2).sum(axis=2), axis=1)
+    while len(centroids) < k:
+        p = weights * dist
+        if p.sum() <= 0:
+            # Fewer distinct points than centroids: duplicate a point
+            p = weights
+        new = W[rng.choice(len(W), p=p / p.sum())]
+        centroids.append(new)
+        np.minimum(dist, ((W - new) ** 2).sum(axis=1), out=dist)
+    return np.array(centroids)
+
+
+class GeneratorQuantizer:
+    """
+    Mini-batch k-means quantization of a D-norm generator sample.
+
+    Parameters
+    ----------
+    k : int
+        Number of atoms
+    batch_size : int
+        Points per mini-batch
+    n_batches : int
+        Number of mini-batch updates
+    init : ndarray of shape (k0, d), optional
+        Atoms (or simplex centroids) of a previous fit, k0 <= k; the missing
+        centroids are added by k-means++
+    seed : int, optional
+    n_seeding : int
+        Size of the subsample used by k-means++
+
+    Attributes
+    ----------
+    atoms_ : ndarray of shape (k, d)
+        Uniformly weighted generator atoms, mean 1 in each coordinate
+    centroids_ : ndarray of shape (k, d)
+        Centroids on the simplex
+    masses_ : ndarray of shape (k,)
+        R-weighted probability of each cell
+    """
+
+    def __init__(self, k, batch_size=4096, n_batches=200, init=None, seed=None,
+                 n_seeding=20_000):
+        self.k = k
+        self.batch_size = batch_size
+        self.n_batches = n_batches
+        self.init = init
+        self.seed = seed
+        self.n_seeding = n_seeding
+
+    def fit(self, G, chunk_size=CHUNK_SIZE):
+        """
+        Quantize the generator sample G, of shape (n, d).
+
+        G is rescaled to mean 1 in each coordinate (the empirical generator),
+        and rows with G = 0, which do not contribute to the stdf, are ignored.
+        """
+        rng = np.random.default_rng(self.seed)
+        G = np.asarray(G)
+        scale = G.mean(axis=0)
+        R = np.empty(len(G))
+        for start in range(0, len(G), chunk_size):
+            R[start:start + chunk_size] = (G[start:start + chunk_size] / scale).sum(axis=1)
+        R_mean = R.mean()
+        rows = np.flatnonzero(R > 0)
+
+        def directions(idx):
+            g = G[idx] / scale
+            return g / g.sum(axis=1, keepdims=True), g.sum(axis=1)
+
+        # Seeding, with the warm-start centroids first
+        init = None
+        if self.init is not None:
+            init = np.asarray(self.init, dtype=np.float64)
+            if len(init) > self.k:
+                raise ValueError(f"init has {len(init)} atoms, more than k={self.k}")
+            init = init / init.sum(axis=1, keepdims=True)
+        seeding = rng.choice(rows, min(self.n_seeding, len(rows)), replace=False)
+        W, weights = directions(seeding)
+        centroids = _kmeans_plus_plus(W, weights, self.k, rng, init)
+
+        # Mini-batch updates: each centroid moves towards the weighted mean of
+        # its batch points with step (batch mass) / (cumulative mass)
+        cumulative = np.zeros(self.k)
+        d = G.shape[1]
+        for _ in range(self.n_batches):
+            W, weights = directions(rng.choice(rows, self.batch_size))
+            labels = _nearest(W, centroids)
+            mass = np.bincount(labels, weights, minlength=self.k)
+            sums = np.stack([np.bincount(labels, weights * W[:, j], minlength=self.k)
+                             for j in range(d)], axis=1)
+            cumulative += mass
+            hit = mass > 0
+            centroids[hit] += (sums[hit] - mass[hit, None] * centroids[hit]) / cumulative[hit, None]
+
+        # Final full Lloyd step: centroids are exact cell means
+        mass = np.zeros(self.k)
+        sums = np.zeros((self.k, d))
+        for start in range(0, len(rows), chunk_size):
+            W, weights = directions(rows[start:start + chunk_size])
+            labels = _nearest(W, centroids)
+            mass += np.bincount(labels, weights, minlength=self.k)
+            for j in range(d):
+                sums[:, j] += np.bincount(labels, weights * W[:, j], minlength=self.k)
+        hit = mass > 0
+        centroids[hit] = sums[hit] / mass[hit, None]
+
+        self.masses_ = mass / mass.sum()
+        self.centroids_ = centroids
+        self.atoms_ = self.k * self.masses_[:, None] * R_mean * centroids
+        return self
+
+    def stdf(self, X):
+        """Stdf of the atoms at the query points X, of shape (q, d), in O(k) per query."""
+        return stdf_from_generator(X, self.atoms_)
+
+    def sample(self, n, seed=None, chunk_size=CHUNK_SIZE):
+        """
+        Max-linear scenarios Z_j = max_i gamma_ij F_i / k, F_i iid unit Frechet.
+
+        Z has unit Frechet margins and the stdf of the atoms.
+
+        Returns
+        -------
+        Z : ndarray of shape (n, d)
+        """
+        rng = np.random.default_rng(seed)
+        atoms = self.atoms_ / self.k
+        Z = np.empty((n, atoms.shape[1]))
+        F = np.empty((min(chunk_size, n), self.k))
+        for start in range(0, n, chunk_size):
+            f = frechet_sample(None, 1.0, rng, out=F[:min(chunk_size, n - start)])
+            for j in range(atoms.shape[1]):
+                np.max(f * atoms[:, j], axis=1, out=Z[start:start + len(f), j])
+        return Z
+
+
+def quantization_errors(G, ks, reference=None, n_directions=1000, seed=0, **kwargs):
+    """
+    Stdf approximation error of the quantized generator as a function of k.
+
+    Parameters
+    ----------
+    G : ndarray of shape (n, d)
+        Generator sample
+    ks : sequence of int
+        Numbers of atoms, fitted in increasing order with warm starts
+    reference : callable, optional
+        Target stdf X -> l(X); the stdf of the rescaled sample G if None
+    n_directions : int
+        Number of query points on the simplex
+    **kwargs
+        Passed to GeneratorQuantizer
+
+    Returns
+    -------
+    errors : ndarray of shape (len(ks),)
+        sup over the queries of |l_k(x) - l(x)| / |x|_inf
+    quantizers : list of GeneratorQuantizer
+    """
+    X = simplex_directions(G.shape[1], n_directions, seed)
+    if reference is None:
+        target = stdf_from_generator(X, G / G.mean(axis=0))
+    else:
+        target = reference(X)
+    norm = np.max(X, axis=1)
+
+    errors, quantizers = [], []
+    init = None
+    for k in sorted(ks):
+        quantizer = GeneratorQuantizer(k, init=init, seed=seed, **kwargs).fit(G)
+        errors.append(np.max(np.abs(quantizer.stdf(X) - target) / norm))
+        quantizers.append(quantizer)
+        init = quantizer.centroids_
+    return np.array(errors), quantizers
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Quantize a Gumbel D-norm generator.')
+    parser.add_argument('--theta', type=float, default=2.0)
+    parser.add_argument('--dim', type=int, default=2)
+    parser.add_argument('--n', type=int, default=1_000_000)
+    parser.add_argument('--k', type=int, nargs='+', default=[2, 4, 8, 16, 32, 64, 128])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    G = gumbel_generator_sample(args.n, args.theta, args.dim, args.seed)
+    start = time.perf_counter()
+    errors, quantizers = quantization_errors(
+        G, args.k, reference=lambda X: gumbel_stdf(X, args.theta), seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Gumbel theta={args.theta}, d={args.dim}, n={args.n} ({elapsed:.1f}s)")
+    print(f"{'k':>6} {'sup error':>10} {'error * k^(1/(d-1))':>20}")
+    for k, error in zip(sorted(args.k), errors):
+        print(f"{k:>6} {error:>10.4f} {error * k ** (1 / (args.dim - 1)):>20.3f}")
@@ -0,0 +1,94 @@
+"""
+On-disk cache for expensive random intermediates shared across figure variants.
+
+Parameter sweeps render the same figure for many (alpha, theta, ...) values.
+Draws that do not depend on the swept parameter (base uniforms, exponentials,
+copula samples for a fixed theta) are computed once per seed and stored as
+.npy files, so every variant, in every worker process, reuses the same draws.
+
+Cache location: code/.cache/ (override with the MANUSCRIPT_CACHE_DIR variable).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+CACHE_DIR = os.environ.get(
+    'MANUSCRIPT_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+
+
+def cache_path(name, key):
+    """
+    Path of the cache file for intermediate `name` with parameters `key`.
+
+    Parameters
+    ----------
+    name : str
+        Name of the intermediate (used as file prefix)
+    key : dict
+        JSON-serializable parameters the intermediate depends on
+
+    Returns
+    -------
+    path : str
+    """
+    digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f'{name}-{digest}.npy')
+
+
+def cached(name, key, compute, use_cache=True):
+    """
+    Return the array `compute()`, loading it from disk when already cached.
+
+    Files are written to a temporary name and renamed atomically, so several
+    sweep workers can race on the same entry without reading partial files.
+
+    The result is read-only on every path (a memory map of the cache file,
+    or the write-protected computed array if use_cache is False), so that
+    code working on the first run also works on cache hits. Copy it before
+    in-place use, e.g. pareto_quantile(U.copy(), alpha, out=...).
+
+    Parameters
+    ----------
+    name : str
+        Name of the intermediate
+    key : dict
+        Parameters the intermediate depends on (seed, sizes, ...)
+    compute : callable
+        Zero-argument function returning an ndarray
+    use_cache : bool
+        If False, always recompute and do not touch the disk
+
+    Returns
+    -------
+    array : ndarray, read-only
+    """
+    if not use_cache:
+        array = compute()
+        array.setflags(write=False)
+        return array
+
+    path = cache_path(name, key)
+    if os.path.exists(path):
+        return np.load(path, mmap_mode='r')
+
+    array = compute()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.npy.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+    return np.load(path, mmap_mode='r')
+
+
+def clear_cache():
+    """Remove every cached intermediate."""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for fname in os.listdir(CACHE_DIR):
+        if fname.endswith('.npy'):
+            os.remove(os.path.join(CACHE_DIR, fname))
@@ -0,0 +1,121 @@
+"""
+Render an introduction figure over a parameter grid, one process per variant.
+
+Each figure module (fig_<name>.py) exposes `DEFAULTS` (parameter names and
+default values) and `render(output_path, **params)`. Output names carry the
+swept parameters, e.g. tail_dependence_alpha=1.5_theta=2.0.pdf.
+
+Random intermediates shared by several variants are cached on disk by
+sample_cache.py; a module may define `warm_cache(**params)` so that they are
+computed once in the parent process before the workers start.
+
+Usage:
+    python sweep.py tail_dependence --grid alpha=1.5,2.0,2.5 theta=1.33,2.0,4.0
+    python sweep.py heavy_tails --grid alpha=1.5,2.5 --workers 2
+
+Output: figures/intro/sweeps/<name>_<param>=<value>_....pdf
+"""
+
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend
+
+import argparse
+import importlib
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib.pyplot as plt
+
+OUTPUT_DIR = '../figures/intro/sweeps'
+
+
+def parse_grid(items, defaults):
+    """
+    Parse ['alpha=1.5,2.0', 'theta=2.5'] into {'alpha': [1.5, 2.0], 'theta': [2.5]}.
+
+    Values are cast to the type of the corresponding default.
+    """
+    grid = {}
+    for item in items:
+        key, _, values = item.partition('=')
+        if key not in defaults:
+            raise ValueError(f"Unknown parameter '{key}', expected one of {sorted(defaults)}")
+        cast = type(defaults[key])
+        grid[key] = [cast(v) for v in values.split(',')]
+    return grid
+
+
+def variant_name(stem, params):
+    """File stem for one variant, e.g. tail_dependence_alpha=1.5_theta=2.0."""
+    return '_'.join([stem] + [f'{key}={value}' for key, value in params.items()])
+
+
+def expand_grid(grid):
+    """List of dicts, one per combination of the grid values."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def render_variant(figure, output_path, params):
+    """Worker: render one variant and release its figure."""
+    module = importlib.import_module(f'fig_{figure}')
+    fig = module.render(output_path, **params)
+    plt.close(fig)
+    return output_path
+
+
+def run_sweep(figure, grid, output_dir=OUTPUT_DIR, workers=None):
+    """
+    Render `figure` for every combination of `grid` in a process pool.
+
+    Parameters
+    ----------
+    figure : str
+        Figure name, i.e. module fig_<figure>.py
+    grid : dict
+        Parameter name -> list of values
+    output_dir : str
+        Directory receiving the PDF and PNG files
+    workers : int, optional
+        Number of processes (defaults to the number of CPUs)
+
+    Returns
+    -------
+    paths : list of str
+        Paths of the rendered PDF files
+    """
+    module = importlib.import_module(f'fig_{figure}')
+    variants = expand_grid(grid)
+    os.makedirs(output_dir, exist_ok=True)
+
+    if hasattr(module, 'warm_cache'):
+        for params in variants:
+            module.warm_cache(**params)
+
+    paths = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(render_variant, figure,
+                        os.path.join(output_dir, variant_name(figure, params) + '.pdf'),
+                        params)
+            for params in variants
+        ]
+        for future in as_completed(futures):
+            paths.append(future.result())
+    return sorted(paths)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('figure', help='figure name, e.g. tail_dependence or heavy_tails')
+    parser.add_argument('--grid', nargs='+', default=[], metavar='PARAM=V1,V2',
+                        help='values of each swept parameter')
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    defaults = importlib.import_module(f'fig_{args.figure}').DEFAULTS
+    grid = parse_grid(args.grid, defaults)
+    paths = run_sweep(args.figure, grid, args.output_dir, args.workers)
+    print(f"\n{len(paths)} variants rendered to {args.output_dir}")